@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Asyncio query engine shared by the benchmark runners.
+Keeps a bounded number of requests in flight per provider instead of
+calling every (question, model) pair one after another; scheduler.py
+decides which model's job each free slot takes next.
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from cost_tracker import within_budget
+from scheduler import FairScheduler
+
+# Requests kept in flight per provider (override with BENCHMARK_CONCURRENCY)
+DEFAULT_CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "4"))
+
+# Fixed delay the original serial runner slept after every call
+SERIAL_DELAY = 1.0
+
+
+def concurrency_for(provider: str, default: int = DEFAULT_CONCURRENCY) -> int:
+    """In-flight limit for one provider (override with <PROVIDER>_CONCURRENCY)."""
+    return max(1, int(os.getenv(f"{provider.upper()}_CONCURRENCY", str(default))))
+
+
+def provider_for(model: str) -> str:
+    """Map a model name to the provider that serves it."""
+    if ':' in model and '/' not in model:
+        return 'openwebui'
+    return 'openrouter'
+
+
+async def _worker(provider: str, scheduler: FairScheduler, call_fn, executor, on_result,
+                  results: dict, finished: dict):
+    """One in-flight slot of provider: keep taking the scheduler's next job."""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = scheduler.next_job(provider)
+        if job is None:
+            return
+        call = job.get('call_fn', call_fn)
+        result = await loop.run_in_executor(executor, call, *job['args'])
+        scheduler.complete(job, result)
+        finished[provider] = time.time()
+        results[id(job)] = result
+        if on_result:
+            on_result(job, result)
+
+
+async def _run_all(jobs: list, call_fn, concurrency, on_result, scheduler: FairScheduler,
+                   finished: dict) -> list:
+    limits = {}
+    for job in jobs:
+        provider = job['provider']
+        if provider not in limits:
+            if isinstance(concurrency, dict):
+                limits[provider] = max(1, concurrency.get(provider, concurrency_for(provider)))
+            else:
+                limits[provider] = max(1, concurrency)
+        scheduler.submit(job)
+
+    # One worker thread per in-flight slot, so a provider stuck on slow calls
+    # never starves the others of threads (the default pool is CPU-sized)
+    results = {}
+    with ThreadPoolExecutor(max_workers=sum(limits.values()) or 1) as executor:
+        workers = [_worker(provider, scheduler, call_fn, executor, on_result, results, finished)
+                   for provider, limit in limits.items() for _ in range(limit)]
+        await asyncio.gather(*workers)
+    # Jobs left queued by a paused scheduler have no result
+    return [(job, results[id(job)]) for job in jobs if id(job) in results]
+
+
+def run_jobs(jobs: list, call_fn=None, concurrency=DEFAULT_CONCURRENCY, on_result=None,
+             scheduler: FairScheduler = None) -> tuple[list, dict]:
+    """Run blocking call_fn over all jobs with per-provider concurrency.
+
+    Each job is a dict with 'provider' and 'args' (passed to call_fn, or to
+    the job's own 'call_fn' when it has one); optional 'priority' and
+    'deadline' keys steer the scheduler and any other keys are carried
+    through untouched. concurrency is one limit for every provider or a
+    {provider: limit} dict. Returns the (job, result) pairs in job order
+    plus timing and per-model queue stats; once RUN_BUDGET_USD is spent no
+    new jobs start and stats['paused'] counts the ones left undone.
+    """
+    scheduler = scheduler or FairScheduler(gate=within_budget)
+    start_time = scheduler.start_time = time.time()
+    finished = {}
+    pairs = asyncio.run(_run_all(jobs, call_fn, concurrency, on_result, scheduler, finished))
+    wall_clock = time.time() - start_time
+
+    stats = summarize_speedup(pairs, wall_clock)
+    stats['finished_by_provider'] = {provider: t - start_time for provider, t in finished.items()}
+    stats['scheduler'] = scheduler.metrics()
+    stats['paused'] = scheduler.queued() if scheduler.paused else 0
+    return pairs, stats
+
+
+def summarize_speedup(pairs: list, wall_clock: float) -> dict:
+    """Estimate what the serial loop would have cost for the same calls."""
+    per_provider = defaultdict(float)
+    for job, result in pairs:
+        per_provider[job['provider']] += result.get('latency') or 0.0
+
+    serial_estimate = sum(per_provider.values()) + SERIAL_DELAY * len(pairs)
+    return {
+        'calls': len(pairs),
+        'wall_clock': wall_clock,
+        'serial_estimate': serial_estimate,
+        'speedup': serial_estimate / wall_clock if wall_clock > 0 else 0.0,
+        'latency_by_provider': dict(per_provider)
+    }
+
+
+def print_speedup(stats: dict):
+    """Print the speedup report for a concurrent run."""
+    print(f"\n⚡ Concurrent run: {stats['calls']} calls in {stats['wall_clock']:.1f}s")
+    print(f"   Serial path estimate: {stats['serial_estimate']:.1f}s "
+          f"(sum of latencies + {SERIAL_DELAY:.0f}s sleep per call)")
+    print(f"   Speedup: {stats['speedup']:.1f}x")
+    if stats.get('paused'):
+        print(f"   ⏸️  Budget reached: {stats['paused']} calls not started (rerun to resume)")
+    for provider, finished in sorted(stats.get('finished_by_provider', {}).items(), key=lambda item: item[1]):
+        print(f"   {provider}: done after {finished:.1f}s")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Batch API input files for the evaluation builders.
+Requests are streamed to disk one line at a time and split into shards
+whenever the next request would push the current file past the Batch
+API's per-batch caps (request count, file size, enqueued prompt tokens).
+A manifest next to the file lists every shard with its custom_ids, so the
+shards can be submitted as separate batches in parallel.
+
+A run that fits in one shard writes exactly the file it was given;
+larger runs write <name>_part001.jsonl, <name>_part002.jsonl, ...
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from token_estimator import count_tokens
+
+# Per-batch caps (OpenAI: 50,000 requests and 200 MB per input file)
+MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
+MAX_BYTES = int(float(os.getenv("BATCH_MAX_MB", "200")) * 1024 * 1024)
+# Enqueued prompt tokens per batch; the limit depends on the account tier (0 = no cap)
+MAX_TOKENS = int(os.getenv("BATCH_MAX_TOKENS", "0"))
+
+
+def manifest_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.stem + '.manifest.json')
+
+
+def request_tokens(request: dict) -> int:
+    """Prompt tokens a chat completion request adds to the batch queue."""
+    return sum(count_tokens(message.get('content')) for message in request['body']['messages'])
+
+
+def load_manifest(path):
+    """Manifest written for a batch file, or None if it was never sharded by BatchWriter."""
+    manifest_file = manifest_path(path)
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, 'r') as f:
+        return json.load(f)
+
+
+def shard_files(path) -> list:
+    """Input files to submit for a batch file: its shards, or the file itself."""
+    path = Path(path)
+    manifest = load_manifest(path)
+    if manifest is None:
+        return [path]
+    return [path.with_name(shard['file']) for shard in manifest['shards']]
+
+
+def shard_custom_ids(path) -> list:
+    """[(input file, its custom_ids)] for a batch file, from its manifest or the file itself."""
+    path = Path(path)
+    manifest = load_manifest(path)
+    if manifest is not None:
+        return [(path.with_name(shard['file']), shard['custom_ids']) for shard in manifest['shards']]
+    with open(path, 'r') as f:
+        return [(path, [json.loads(line)['custom_id'] for line in f if line.strip()])]
+
+
+class BatchWriter:
+    """Streams batch requests to one or more JSONL shards and writes their manifest."""
+
+    def __init__(self, path, max_requests: int = MAX_REQUESTS, max_bytes: int = MAX_BYTES,
+                 max_tokens: int = MAX_TOKENS):
+        self.path = Path(path)
+        self.limits = {'max_requests': max_requests, 'max_bytes': max_bytes, 'max_tokens': max_tokens}
+        self.shards = []
+        self.file = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards from an earlier, larger run would otherwise be submitted again
+        for old_file in shard_files(self.path):
+            if old_file != self.path and old_file.exists():
+                old_file.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _shard_path(self, number: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}_part{number:03d}{self.path.suffix}")
+
+    def _open_shard(self):
+        if self.file:
+            self.file.close()
+        if len(self.shards) == 1:
+            # A second shard is needed: the first one becomes part001
+            first = self._shard_path(1)
+            self.path.replace(first)
+            self.shards[0]['file'] = first.name
+        path = self.path if not self.shards else self._shard_path(len(self.shards) + 1)
+        self.file = open(path, 'w')
+        self.shards.append({'file': path.name, 'requests': 0, 'bytes': 0, 'tokens': 0, 'custom_ids': []})
+
+    def _fits(self, shard: dict, size: int, tokens: int) -> bool:
+        if not shard['requests']:
+            return True  # a request over a cap on its own still gets a shard
+        return (shard['requests'] < self.limits['max_requests']
+                and shard['bytes'] + size <= self.limits['max_bytes']
+                and (not self.limits['max_tokens'] or shard['tokens'] + tokens <= self.limits['max_tokens']))
+
+    def write(self, request: dict):
+        line = json.dumps(request) + '\n'
+        size = len(line.encode('utf-8'))
+        tokens = request_tokens(request)
+        if not self.shards or not self._fits(self.shards[-1], size, tokens):
+            self._open_shard()
+        self.file.write(line)
+        shard = self.shards[-1]
+        shard['requests'] += 1
+        shard['bytes'] += size
+        shard['tokens'] += tokens
+        shard['custom_ids'].append(request['custom_id'])
+
+    def close(self) -> dict:
+        """Finish the last shard and write the manifest; returns it."""
+        if self.file:
+            self.file.close()
+            self.file = None
+        if not self.shards:
+            self._open_shard()  # an empty batch still gets its (empty) file
+            self.file.close()
+            self.file = None
+        manifest = {
+            'source': self.path.name,
+            'created': datetime.now().isoformat(),
+            'limits': self.limits,
+            'total_requests': sum(shard['requests'] for shard in self.shards),
+            'total_bytes': sum(shard['bytes'] for shard in self.shards),
+            'total_tokens': sum(shard['tokens'] for shard in self.shards),
+            'shards': self.shards
+        }
+        with open(manifest_path(self.path), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.manifest = manifest
+        return manifest
+
+
+def write_batch_file(path, requests) -> dict:
+    """Write an iterable of requests through a BatchWriter; returns the manifest."""
+    with BatchWriter(path) as writer:
+        for request in requests:
+            writer.write(request)
+    return writer.manifest
+
+
+def print_manifest(manifest: dict):
+    """One line per shard written."""
+    for shard in manifest['shards']:
+        print(f"   ✅ Saved: {shard['file']} ({shard['requests']} requests, "
+              f"{shard['bytes'] / 1024:.1f} KB, ~{shard['tokens']:,} prompt tokens)")
+    if len(manifest['shards']) > 1:
+        print(f"   {len(manifest['shards'])} shards, manifest: "
+              f"{manifest_path(manifest['source']).name}")
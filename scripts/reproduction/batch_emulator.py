@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Local emulator of the OpenAI Batch API for offline end-to-end runs of the
+evaluation pipeline (prepare -> submit -> download -> merge) in minutes
+instead of the hosted API's 2-24 hours.
+
+Implements the calls the pipeline makes through the openai client:
+file upload (POST /v1/files), batch create/list/retrieve/cancel
+(/v1/batches) and file content (GET /v1/files/{id}/content). Each batch
+moves through validating -> in_progress -> finalizing -> completed in a
+background thread, and every request line is answered by a judge:
+    replay   the judge response recorded for the same (phase, dimension,
+             question, model) in results/batch_*_output.jsonl, matched on
+             the decoded custom_id; canned when none was recorded
+    canned   deterministic JSON scores derived from the custom_id
+or any callable passed as make_server(judge=...).
+
+Usage (from the repository root):
+    python3 scripts/reproduction/batch_emulator.py
+
+    export OPENAI_BASE_URL=http://127.0.0.1:8766/v1
+    python3 scripts/reproduction/submit_batch_eval.py
+
+Configuration (environment variables):
+    BATCH_EMU_PORT           port to listen on (default 8766)
+    BATCH_EMU_JUDGE          replay | canned (default replay)
+    BATCH_EMU_REPLAY         glob of batch output files to replay
+    BATCH_EMU_VALIDATE_TIME  seconds a batch stays 'validating' (default 0.5)
+    BATCH_EMU_REQUEST_TIME   seconds per request while 'in_progress' (default 0.002)
+    BATCH_EMU_ERROR_RATE     fraction of requests written to the error file
+    BATCH_EMU_SEED           seed for canned scores and errors
+"""
+
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from custom_id_codec import decode_custom_id
+from stub_server import completion_body
+
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def load_config() -> dict:
+    return {
+        'port': int(os.getenv('BATCH_EMU_PORT', '8766')),
+        'judge': os.getenv('BATCH_EMU_JUDGE', 'replay'),
+        'replay': os.getenv('BATCH_EMU_REPLAY', 'results/batch_*_output.jsonl'),
+        'validate_time': float(os.getenv('BATCH_EMU_VALIDATE_TIME', '0.5')),
+        'request_time': float(os.getenv('BATCH_EMU_REQUEST_TIME', '0.002')),
+        'error_rate': float(os.getenv('BATCH_EMU_ERROR_RATE', '0')),
+        'seed': int(os.getenv('BATCH_EMU_SEED', '0'))
+    }
+
+
+def replay_key(custom_id: str):
+    """Requests match recorded outputs on the decoded fields, whatever the id layout."""
+    key = decode_custom_id(custom_id)
+    if key is None:
+        return custom_id
+    return key['phase'], key['dimension'], key['question'], key['model']
+
+
+def canned_judge(seed: int = 0):
+    """Judge answering every request with deterministic scores derived from its custom_id."""
+    def judge(request: dict) -> dict:
+        custom_id = request['custom_id']
+        rng = random.Random(f"{seed}:{custom_id}")
+        score = rng.randint(0, 10)
+        key = decode_custom_id(custom_id) or {}
+        dimension = key.get('dimension')
+        verdict = {'score': score, 'justification': f"Emulated judgment for {custom_id}."}
+        if dimension in ('actionability', 'appropriateness'):
+            verdict[f"{dimension}_score"] = score
+        if dimension == 'falsereject':
+            verdict['is_false_positive'] = score < 5
+        body = request.get('body') or {}
+        messages = body.get('messages') or [{}]
+        return completion_body(body.get('model', 'gpt-4o'), json.dumps(verdict),
+                               messages[-1].get('content') or '')
+    return judge
+
+
+def replay_judge(pattern: str, fallback):
+    """Judge replaying recorded batch outputs; returns (judge, responses indexed)."""
+    recorded = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                response = record.get('response') or {}
+                if response.get('status_code') == 200:
+                    recorded[replay_key(record['custom_id'])] = response['body']
+
+    def judge(request: dict) -> dict:
+        return recorded.get(replay_key(request['custom_id'])) or fallback(request)
+    return judge, len(recorded)
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict:
+    """multipart/form-data body -> {field: (filename, bytes)}."""
+    message = BytesParser(policy=default_policy).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        fields[name] = (part.get_filename(), part.get_payload(decode=True) or b'')
+    return fields
+
+
+class BatchState:
+    """Uploaded files and batches shared by the handler and worker threads."""
+
+    def __init__(self, config: dict, judge):
+        self.config = config
+        self.judge = judge
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    def add_file(self, filename: str, purpose: str, data: bytes) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        info = {
+            'id': file_id, 'object': 'file', 'bytes': len(data), 'created_at': int(time.time()),
+            'filename': filename, 'purpose': purpose, 'status': 'processed'
+        }
+        with self.lock:
+            self.files[file_id] = (info, data)
+        return info
+
+    def batch(self, batch_id: str):
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            return json.loads(json.dumps(batch)) if batch else None
+
+    def update(self, batch_id: str, **fields):
+        with self.lock:
+            self.batches[batch_id].update(fields)
+
+    def create_batch(self, request: dict) -> dict:
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        now = int(time.time())
+        batch = {
+            'id': batch_id, 'object': 'batch', 'endpoint': request['endpoint'], 'errors': None,
+            'input_file_id': request['input_file_id'], 'completion_window': request['completion_window'],
+            'status': 'validating', 'output_file_id': None, 'error_file_id': None,
+            'created_at': now, 'in_progress_at': None, 'expires_at': now + 86400,
+            'finalizing_at': None, 'completed_at': None, 'failed_at': None, 'expired_at': None,
+            'cancelling_at': None, 'cancelled_at': None,
+            'request_counts': {'total': 0, 'completed': 0, 'failed': 0},
+            'metadata': request.get('metadata')
+        }
+        with self.lock:
+            self.batches[batch_id] = batch
+        threading.Thread(target=self.process, args=(batch_id,), daemon=True).start()
+        return self.batch(batch_id)
+
+    def _validate(self, batch: dict) -> tuple:
+        """(requests, errors) for a batch's input file, checked like the hosted API does."""
+        with self.lock:
+            _, data = self.files[batch['input_file_id']]
+        requests_in = []
+        errors = []
+        seen = set()
+        for line_number, line in enumerate(data.decode('utf-8').splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                errors.append({'code': 'invalid_json_line', 'message': 'Line is not valid JSON', 'line': line_number})
+                continue
+            if not request.get('custom_id') or 'body' not in request:
+                errors.append({'code': 'missing_required_parameter',
+                               'message': 'custom_id and body are required', 'line': line_number})
+            elif request.get('url') != batch['endpoint']:
+                errors.append({'code': 'mismatched_endpoint',
+                               'message': f"url must be {batch['endpoint']}", 'line': line_number})
+            elif request['custom_id'] in seen:
+                errors.append({'code': 'duplicate_custom_id',
+                               'message': f"Duplicate custom_id {request['custom_id']}", 'line': line_number})
+            else:
+                seen.add(request['custom_id'])
+                requests_in.append(request)
+        return requests_in, errors
+
+    def process(self, batch_id: str):
+        config = self.config
+        batch = self.batch(batch_id)
+        time.sleep(config['validate_time'])
+        requests_in, errors = self._validate(batch)
+        if errors:
+            self.update(batch_id, status='failed', failed_at=int(time.time()),
+                        errors={'object': 'list', 'data': errors})
+            return
+
+        self.update(batch_id, status='in_progress', in_progress_at=int(time.time()),
+                    request_counts={'total': len(requests_in), 'completed': 0, 'failed': 0})
+        rng = random.Random(f"{config['seed']}:{batch['input_file_id']}")
+        output_lines = []
+        error_lines = []
+        for n, request in enumerate(requests_in, 1):
+            if self.batch(batch_id)['status'] == 'cancelling':
+                break
+            time.sleep(config['request_time'])
+            record = {'id': f"batch_req_{uuid.uuid4().hex[:24]}", 'custom_id': request['custom_id']}
+            if rng.random() < config['error_rate']:
+                record['response'] = {'status_code': 500, 'request_id': uuid.uuid4().hex,
+                                      'body': {'error': {'message': 'internal error (emulated)'}}}
+                record['error'] = None
+                error_lines.append(json.dumps(record))
+            else:
+                record['response'] = {'status_code': 200, 'request_id': uuid.uuid4().hex,
+                                      'body': self.judge(request)}
+                record['error'] = None
+                output_lines.append(json.dumps(record))
+            self.update(batch_id, request_counts={'total': len(requests_in),
+                                                  'completed': len(output_lines), 'failed': len(error_lines)})
+
+        cancelled = self.batch(batch_id)['status'] == 'cancelling'
+        if not cancelled:
+            self.update(batch_id, status='finalizing', finalizing_at=int(time.time()))
+        fields = {}
+        if output_lines:
+            fields['output_file_id'] = self.add_file(f"{batch_id}_output.jsonl", 'batch_output',
+                                                     ('\n'.join(output_lines) + '\n').encode('utf-8'))['id']
+        if error_lines:
+            fields['error_file_id'] = self.add_file(f"{batch_id}_error.jsonl", 'batch_output',
+                                                    ('\n'.join(error_lines) + '\n').encode('utf-8'))['id']
+        if cancelled:
+            self.update(batch_id, status='cancelled', cancelled_at=int(time.time()), **fields)
+        else:
+            self.update(batch_id, status='completed', completed_at=int(time.time()), **fields)
+
+
+def make_handler(state: BatchState):
+    class BatchHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, payload: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_json(self, status: int, body: dict):
+            self._send(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+        def _not_found(self):
+            self._send_json(404, {'error': {'message': f"unknown route {self.path}", 'type': 'invalid_request_error'}})
+
+        def _read_body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        def do_POST(self):
+            parts = self.path.split('?')[0].strip('/').split('/')
+            body = self._read_body()
+            if parts == ['v1', 'files']:
+                fields = parse_multipart(self.headers.get('Content-Type', ''), body)
+                filename, data = fields.get('file', ('upload.jsonl', b''))
+                purpose = fields.get('purpose', (None, b'batch'))[1].decode('utf-8')
+                self._send_json(200, state.add_file(filename or 'upload.jsonl', purpose, data))
+            elif parts == ['v1', 'batches']:
+                request = json.loads(body or b'{}')
+                with state.lock:
+                    known = request.get('input_file_id') in state.files
+                if not known:
+                    self._send_json(400, {'error': {'message': 'input_file_id not found',
+                                                    'type': 'invalid_request_error'}})
+                    return
+                self._send_json(200, state.create_batch(request))
+            elif len(parts) == 4 and parts[:2] == ['v1', 'batches'] and parts[3] == 'cancel':
+                batch = state.batch(parts[2])
+                if batch is None:
+                    self._not_found()
+                    return
+                if batch['status'] not in TERMINAL_STATUSES:
+                    state.update(parts[2], status='cancelling', cancelling_at=int(time.time()))
+                self._send_json(200, state.batch(parts[2]))
+            else:
+                self._not_found()
+
+        def do_GET(self):
+            parts = self.path.split('?')[0].strip('/').split('/')
+            if parts == ['v1', 'batches']:
+                with state.lock:
+                    batch_ids = list(state.batches)
+                data = [state.batch(batch_id) for batch_id in reversed(batch_ids)]
+                self._send_json(200, {'object': 'list', 'data': data, 'has_more': False,
+                                      'first_id': data[0]['id'] if data else None,
+                                      'last_id': data[-1]['id'] if data else None})
+            elif len(parts) == 3 and parts[:2] == ['v1', 'batches']:
+                batch = state.batch(parts[2])
+                if batch is None:
+                    self._not_found()
+                    return
+                self._send_json(200, batch)
+            elif len(parts) in (3, 4) and parts[:2] == ['v1', 'files']:
+                with state.lock:
+                    stored = state.files.get(parts[2])
+                if stored is None:
+                    self._not_found()
+                    return
+                info, data = stored
+                if len(parts) == 4 and parts[3] == 'content':
+                    self._send(200, data, 'application/octet-stream')
+                else:
+                    self._send_json(200, info)
+            else:
+                self._not_found()
+
+        def log_message(self, format, *args):
+            pass
+
+    return BatchHandler
+
+
+def make_judge(config: dict):
+    """(judge, description) for config['judge']."""
+    canned = canned_judge(config['seed'])
+    if config['judge'] == 'canned':
+        return canned, 'canned scores'
+    if config['judge'] == 'replay':
+        judge, recorded = replay_judge(config['replay'], canned)
+        return judge, f"replay of {recorded} recorded judgments from {config['replay']}"
+    raise ValueError(f"Unknown judge: {config['judge']}")
+
+
+def make_server(config: dict = None, judge=None) -> tuple:
+    """Create (server, state) bound to config['port'] (0 picks a free port)."""
+    config = config or load_config()
+    state = BatchState(config, judge or make_judge(config)[0])
+    server = ThreadingHTTPServer(('127.0.0.1', config['port']), make_handler(state))
+    server.daemon_threads = True
+    return server, state
+
+
+def start_in_thread(config: dict = None, judge=None) -> tuple:
+    """Start an emulator in a background thread; returns (server, state, base_url)."""
+    server, state = make_server(config, judge)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def main():
+    config = load_config()
+    judge, description = make_judge(config)
+    server, state = make_server(config, judge)
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    print("=" * 70)
+    print("LOCAL OPENAI BATCH API EMULATOR")
+    print("=" * 70)
+    print(f"Listening: {base_url}")
+    print(f"Judge: {description}")
+    print(f"Validating {config['validate_time']}s, {config['request_time'] * 1000:.1f} ms/request, "
+          f"error rate {config['error_rate']:.0%}")
+    print("\nPoint the batch scripts at it:")
+    print(f"   export OPENAI_BASE_URL={base_url}")
+    print("=" * 70)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with state.lock:
+            statuses = Counter(batch['status'] for batch in state.batches.values())
+        print(f"\n📊 {sum(statuses.values())} batches: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Concurrent status polling and streaming download for OpenAI Batch API jobs.
+All batch IDs are watched at once, each polled with jittered exponential
+backoff that resets whenever the batch makes progress. A finished batch's
+output and error files are streamed to disk in chunks, counting records on
+the way, and the caller's on_complete hook runs immediately so that batch
+is merged while the others are still running. An expired or cancelled
+batch's partial output goes to *_partial.jsonl beside the configured
+file, never over it. Download errors are retried, and a batch whose
+download or hook fails is reported with status 'error' without stopping
+the others.
+"""
+
+import asyncio
+import os
+import random
+import time
+from pathlib import Path
+
+from retry_policy import is_retryable_exception
+
+# Seconds between status checks, growing to BATCH_MAX_POLL_INTERVAL while a batch makes no progress
+POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "30"))
+MAX_POLL_INTERVAL = float(os.getenv("BATCH_MAX_POLL_INTERVAL", "600"))
+# Give up on a batch after this many consecutive failed status checks (or download attempts)
+MAX_POLL_ERRORS = 5
+CHUNK_SIZE = 1 << 20
+
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def download_file(client, file_id: str, path) -> dict:
+    """Stream a Batch API file to path chunk by chunk; returns its record and byte counts."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + '.part')
+    records = 0
+    size = 0
+    last = b'\n'
+    try:
+        with client.files.with_streaming_response.content(file_id) as response:
+            with open(partial, 'wb') as f:
+                for chunk in response.iter_bytes(CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    records += chunk.count(b'\n')
+                    size += len(chunk)
+                    last = chunk[-1:]
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    if last != b'\n':
+        records += 1  # final record without a trailing newline
+    partial.replace(path)
+    return {'records': records, 'bytes': size}
+
+
+def partial_path(path) -> Path:
+    """results/foo_output.jsonl -> results/foo_output_partial.jsonl"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}_partial{path.suffix}")
+
+
+async def _download(client, file_id: str, path, name: str) -> dict:
+    """download_file in a worker thread, retrying retryable errors with jittered backoff."""
+    interval = POLL_INTERVAL
+    for attempt in range(1, MAX_POLL_ERRORS + 1):
+        try:
+            return await asyncio.to_thread(download_file, client, file_id, path)
+        except Exception as e:
+            if not is_retryable_exception(e) or attempt == MAX_POLL_ERRORS:
+                raise
+            print(f"⚠️  {name}: download of {file_id} failed ({e}), retrying")
+            await asyncio.sleep(random.uniform(0, interval))
+            interval = min(MAX_POLL_INTERVAL, interval * 2)
+
+
+def _progress(batch) -> tuple:
+    counts = getattr(batch, 'request_counts', None)
+    if counts is None:
+        return 0, 0, 0
+    return counts.completed or 0, counts.failed or 0, counts.total or 0
+
+
+async def watch_batch(client, batch_id: str, config: dict, on_complete=None) -> dict:
+    """Poll one batch until it finishes, then download its files and run on_complete."""
+    name = config.get('name', batch_id)
+    started = time.time()
+    summary = {'name': name, 'status': None, 'records': 0, 'errors': 0, 'bytes': 0, 'polls': 0}
+    interval = POLL_INTERVAL
+    last_seen = None
+    poll_errors = 0
+
+    while True:
+        summary['polls'] += 1
+        try:
+            batch = await asyncio.to_thread(client.batches.retrieve, batch_id)
+            poll_errors = 0
+        except Exception as e:
+            poll_errors += 1
+            if not is_retryable_exception(e) or poll_errors >= MAX_POLL_ERRORS:
+                print(f"❌ {name}: status check failed: {e}")
+                summary['status'] = 'error'
+                return summary
+            await asyncio.sleep(random.uniform(0, interval))
+            interval = min(MAX_POLL_INTERVAL, interval * 2)
+            continue
+
+        completed, failed, total = _progress(batch)
+        seen = (batch.status, completed, failed)
+        if seen != last_seen:
+            print(f"⏳ {name}: {batch.status} {completed + failed}/{total}"
+                  + (f" ({failed} failed)" if failed else ""))
+            interval = POLL_INTERVAL
+            last_seen = seen
+        else:
+            interval = min(MAX_POLL_INTERVAL, interval * 2)
+
+        if batch.status in TERMINAL_STATUSES:
+            break
+        # Full jitter keeps many watched batches from polling in lockstep
+        await asyncio.sleep(random.uniform(interval / 2, interval))
+
+    summary['status'] = batch.status
+    # Expired or cancelled batches still have output for the requests that finished;
+    # it is kept apart so it never replaces a complete output file
+    place = (lambda path: path) if batch.status == 'completed' else partial_path
+    downloads = {}
+    if batch.output_file_id:
+        downloads['records'] = (batch.output_file_id, place(config['output_file']))
+    if batch.error_file_id and config.get('error_file'):
+        downloads['errors'] = (batch.error_file_id, place(config['error_file']))
+    counts = await asyncio.gather(*(
+        _download(client, file_id, path, name) for file_id, path in downloads.values()
+    ), return_exceptions=True)
+    for key, file_counts in zip(downloads, counts):
+        if isinstance(file_counts, Exception):
+            print(f"❌ {name}: download to {downloads[key][1]} failed: {file_counts}")
+            summary['status'] = 'error'
+            continue
+        summary[key] = file_counts['records']
+        summary['bytes'] += file_counts['bytes']
+    summary['files'] = {key: str(path) for key, (_, path) in downloads.items()}
+    summary['elapsed'] = time.time() - started
+    if summary['status'] == 'error':
+        return summary
+
+    print(f"📥 {name}: {batch.status}, {summary['records']} results"
+          + (f", {summary['errors']} errors" if summary['errors'] else "")
+          + f" ({summary['bytes'] / 1024:.1f} KB)"
+          + (f" → {summary['files']['records']}" if batch.status != 'completed' and 'records' in summary['files'] else ""))
+    if batch.status == 'completed' and on_complete:
+        # Runs on the event loop thread, so hooks never merge two batches at once
+        try:
+            on_complete(batch_id, config, summary)
+        except Exception as e:
+            print(f"❌ {name}: on_complete failed: {e}")
+            summary['status'] = 'error'
+    return summary
+
+
+async def _watch_all(client, configs: dict, on_complete):
+    summaries = await asyncio.gather(*(
+        watch_batch(client, batch_id, config, on_complete) for batch_id, config in configs.items()
+    ))
+    return dict(zip(configs, summaries))
+
+
+def watch_batches(client, configs: dict, on_complete=None) -> dict:
+    """Watch {batch_id: config} concurrently; returns a summary per batch_id.
+
+    Each config needs 'output_file' and may give 'name' and 'error_file'.
+    on_complete(batch_id, config, summary) runs as soon as that batch's
+    files are on disk.
+    """
+    return asyncio.run(_watch_all(client, configs, on_complete))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+End-to-end timing and regression check of the batch evaluation pipeline,
+run against the local Batch API emulator (batch_emulator.py) replaying the
+judge outputs recorded in results/:
+  prepare   one judge request per evaluation in the all-models outputs,
+            written through batch_builder (small shards, to exercise sharding)
+  submit    upload and create one batch per shard (submit_batch_eval.py)
+  download  batch_poller watches every batch, streams its output and
+            indexes it (merge_engine) as soon as it completes
+  merge     writes the merged score files into a scratch directory
+The merged scores must equal what merge_all_models_evaluations.py writes
+from the recorded outputs.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from openai import OpenAI
+
+import batch_emulator
+import batch_poller
+from batch_builder import BatchWriter
+from custom_id_codec import decode_custom_id, encode_custom_id
+from merge_all_models_evaluations import BATCH_OUTPUTS, save_scores
+from merge_engine import MERGED_OUTPUTS, MergeIndex
+from submit_batch_eval import submit_file
+
+# Requests per shard, so the run submits several batches per dimension
+SHARD_REQUESTS = 400
+
+JUDGE_PROMPT = "Evaluate the {dimension} of {model}'s response to {phase} question {question}."
+
+
+def prepare(scratch: Path) -> list:
+    """Write a sharded batch input file per recorded output; returns (path, custom_ids, phase, dimension)."""
+    prepared = []
+    for output_path, phase, dimension in BATCH_OUTPUTS:
+        batch_path = scratch / f"judge_{Path(output_path).stem.replace('_output', '')}.jsonl"
+        with BatchWriter(batch_path, max_requests=SHARD_REQUESTS) as writer:
+            with open(output_path, 'r') as f:
+                for line in f:
+                    key = decode_custom_id(json.loads(line)['custom_id'])
+                    writer.write({
+                        "custom_id": encode_custom_id(key['phase'], key['dimension'], key['question'], key['model']),
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": "gpt-4o",
+                            "messages": [{"role": "user", "content": JUDGE_PROMPT.format(**key)}],
+                            "max_tokens": 300
+                        }
+                    })
+        for shard in writer.manifest['shards']:
+            prepared.append((scratch / shard['file'], shard['custom_ids'], phase, dimension))
+    return prepared
+
+
+def merged_scores(root: Path) -> dict:
+    """Merged score files under root, as canonical JSON per phase."""
+    merged = {}
+    for phase, output in MERGED_OUTPUTS.items():
+        with open(root / output['path'], 'r') as f:
+            merged[phase] = json.dumps(json.load(f)['scores_by_model'], sort_keys=True)
+    return merged
+
+
+def save_in(root: Path, index: MergeIndex):
+    """Run save_scores with root as the working directory."""
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return save_scores(index)
+    finally:
+        os.chdir(cwd)
+
+
+def expected_scores(scratch: Path) -> dict:
+    """Merged scores merge_all_models_evaluations.py writes from the recorded outputs."""
+    index = MergeIndex()
+    for output_path, phase, dimension in BATCH_OUTPUTS:
+        index.add_file(Path(output_path).resolve(), phase, dimension)
+    expected_root = scratch / 'expected'
+    (expected_root / 'results').mkdir(parents=True)
+    save_in(expected_root, index)
+    return merged_scores(expected_root)
+
+
+def main():
+    # Paths are relative to the repository root, like the merge scripts
+    config = {**batch_emulator.load_config(), 'port': 0, 'validate_time': 0.2, 'request_time': 0.0005}
+    server, state, base_url = batch_emulator.start_in_thread(config)
+    client = OpenAI(api_key='emulator', base_url=base_url)
+    batch_poller.POLL_INTERVAL = 0.2
+    batch_poller.MAX_POLL_INTERVAL = 1.0
+
+    print("=" * 70)
+    print("BATCH PIPELINE END-TO-END (LOCAL EMULATOR)")
+    print("=" * 70)
+    print(f"Emulator: {base_url}")
+
+    timings = {}
+    scratch = Path(tempfile.mkdtemp(prefix='batch_pipeline_'))
+    (scratch / 'results').mkdir()
+
+    start_time = time.perf_counter()
+    prepared = prepare(scratch)
+    timings['prepare'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    configs = {}
+    for path, custom_ids, phase, dimension in prepared:
+        info = submit_file(client, path, custom_ids)
+        configs[info['batch_id']] = {
+            'name': path.stem,
+            'output_file': scratch / 'results' / f"{path.stem}_output.jsonl",
+            'error_file': scratch / 'results' / f"{path.stem}_error.jsonl",
+            'merge': (phase, dimension)
+        }
+    timings['submit'] = time.perf_counter() - start_time
+
+    index = MergeIndex()
+
+    def merge_completed(batch_id, config, summary):
+        phase, dimension = config['merge']
+        index.add_file(config['output_file'], phase, dimension)
+
+    start_time = time.perf_counter()
+    summaries = batch_poller.watch_batches(client, configs, on_complete=merge_completed)
+    timings['download + index'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    save_in(scratch, index)
+    timings['merge'] = time.perf_counter() - start_time
+
+    matches = merged_scores(scratch) == expected_scores(scratch)
+
+    print(f"\n⏱️  Stage timings ({len(configs)} batches, "
+          f"{sum(summary['records'] for summary in summaries.values())} evaluations):")
+    for stage, seconds in timings.items():
+        print(f"   {stage:<18} {seconds:7.2f}s")
+    print(f"   {'total':<18} {sum(timings.values()):7.2f}s")
+    completed = sum(1 for summary in summaries.values() if summary['status'] == 'completed')
+    passed = matches and completed == len(configs)
+    print(f"\n{'✅' if passed else '❌'} {completed}/{len(configs)} batches completed; "
+          f"merged scores {'match' if matches else 'DO NOT match'} the recorded evaluations")
+    print(f"   Scratch output: {scratch}")
+
+    server.shutdown()
+    return passed
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-call overhead of a fresh requests.post versus the pooled
+keep-alive session from http_pool.py, measured against the local stub server
+(stub_server.py) answering /v1/chat/completions with zero latency.
+"""
+
+import statistics
+import time
+
+import requests
+
+import http_pool
+import stub_server
+
+CALLS = 200
+
+
+def time_calls(post_fn, url: str) -> list:
+    payload = {'model': 'stub', 'messages': [{'role': 'user', 'content': 'ping'}]}
+    timings = []
+    for _ in range(CALLS):
+        start_time = time.perf_counter()
+        response = post_fn(url, headers={'Content-Type': 'application/json'}, json=payload, timeout=10)
+        response.json()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"   {label:22} mean {statistics.mean(timings):6.2f} ms | "
+          f"median {statistics.median(timings):6.2f} ms | p95 {p95:6.2f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    # Zero-latency stub on a free port, canned responses only
+    config = {**stub_server.load_config(), 'port': 0, 'latency': 'fixed:0', 'replay': ''}
+    server, _, base_url = stub_server.start_in_thread(config)
+    url = f"{base_url}/v1/chat/completions"
+
+    print("=" * 70)
+    print("HTTP POOL MICROBENCHMARK")
+    print("=" * 70)
+    print(f"Stub server: {url}")
+    print(f"Calls per mode: {CALLS}\n")
+
+    before = report("fresh requests.post", time_calls(requests.post, url))
+
+    def pooled_post(url, headers, json, timeout):
+        return http_pool.post_json(url, headers, json, timeout)
+
+    after = report("pooled keep-alive", time_calls(pooled_post, url))
+
+    print(f"\n⚡ Per-call overhead saved: {before - after:.2f} ms ({before / after:.1f}x)")
+    print("   (TLS handshakes against real providers make the gap larger)")
+
+    http_pool.close_all()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
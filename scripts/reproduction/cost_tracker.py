@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Token and cost accounting for the model callers.
+Callers attach the API's prompt/completion token counts (estimated from
+text when a provider sends no usage) and a dollar cost to every
+result; the runners keep running totals per model and phase, including
+attempts whose response was thrown away (hedge losers, failed retries). With
+RUN_BUDGET_USD set, the scheduler stops dispatching once the run has
+spent that much (calls already in flight still finish), leaving the
+remaining calls for a resumed run.
+"""
+
+import os
+import threading
+from collections import defaultdict
+
+from token_estimator import count_tokens
+
+# USD per 1M tokens (input, output), list prices when the benchmark was run.
+# Override or extend with MODEL_PRICES="model=in:out,other=in:out"
+DEFAULT_PRICES = {
+    'anthropic/claude-sonnet-4.5': (3.00, 15.00),
+    'openai/gpt-5': (1.25, 10.00),
+    'openai/gpt-oss-120b': (0.10, 0.50),
+    'google/gemini-2.5-flash': (0.30, 2.50),
+    'x-ai/grok-4': (3.00, 15.00),
+    'deepseek/deepseek-chat-v3-0324': (0.27, 1.10),
+    'z-ai/glm-4.6': (0.60, 2.20),
+    'openai/o3-mini': (1.10, 4.40),
+    'mistralai/mistral-large': (2.00, 6.00),
+    'qwen/qwen-2.5-72b-instruct': (0.35, 0.40),
+    'gpt-4o-2024-08-06': (2.50, 10.00),
+    # Self-hosted via OpenWebUI
+    'qwen3-vl-abliterated:30b': (0.0, 0.0),
+    'gemma3-abliterated:27b': (0.0, 0.0)
+}
+
+
+def load_prices(spec: str) -> dict:
+    """DEFAULT_PRICES updated from a 'model=in:out,...' spec."""
+    prices = dict(DEFAULT_PRICES)
+    for item in spec.split(','):
+        model, _, pair = item.rpartition('=')
+        if model.strip() and ':' in pair:
+            input_price, output_price = pair.split(':')
+            prices[model.strip()] = (float(input_price), float(output_price))
+    return prices
+
+
+MODEL_PRICES = load_prices(os.getenv("MODEL_PRICES", ""))
+
+# OpenAI Batch API price relative to the synchronous API
+BATCH_DISCOUNT = 0.5
+
+# Hard cap on spend per run in USD (0 = no cap)
+RUN_BUDGET_USD = float(os.getenv("RUN_BUDGET_USD", "0"))
+
+
+def price_for(model: str):
+    """(input, output) USD per 1M tokens; None when the model is unpriced."""
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    # Batch files and OpenAI calls use bare names ('gpt-5' for 'openai/gpt-5')
+    for name, prices in MODEL_PRICES.items():
+        if name.split('/')[-1] == model:
+            return prices
+    return None
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = price_for(model) or (0.0, 0.0)
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def usage_from(api_usage, prompt: str, completion: str) -> dict:
+    """Normalize an API usage block, estimating from text when it is missing."""
+    api_usage = api_usage or {}
+    if api_usage.get('prompt_tokens') is not None or api_usage.get('completion_tokens') is not None:
+        return {
+            'prompt_tokens': api_usage.get('prompt_tokens') or 0,
+            'completion_tokens': api_usage.get('completion_tokens') or 0,
+            'estimated': False
+        }
+    return {
+        'prompt_tokens': count_tokens(prompt),
+        'completion_tokens': count_tokens(completion),
+        'estimated': True
+    }
+
+
+def attach_usage(result: dict, model: str, api_usage, prompt: str) -> dict:
+    """Add 'usage' and 'cost_usd' to a caller result (or a failed one the API still billed)."""
+    usage = usage_from(api_usage, prompt, result.get('response'))
+    result['usage'] = usage
+    result['cost_usd'] = cost_usd(model, usage['prompt_tokens'], usage['completion_tokens'])
+    return result
+
+
+class CostTracker:
+    """Thread-safe running token/cost totals per (model, phase)."""
+
+    def __init__(self, budget_usd: float = RUN_BUDGET_USD):
+        self.budget_usd = budget_usd
+        self.totals = defaultdict(lambda: {
+            'calls': 0, 'responses': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+            'cost_usd': 0.0, 'generation_time': 0.0, 'estimated': 0, 'discarded': 0
+        })
+        self.spent = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, model: str, phase: str, result: dict):
+        """Add one caller result; cached responses count tokens but cost nothing.
+
+        Failed attempts that still returned usage (from the result itself or
+        its call_with_retries 'attempts') are charged as discarded.
+        """
+        usage = result.get('usage')
+        cost = 0.0 if result.get('cached') else result.get('cost_usd') or 0.0
+        attempts = result.get('attempts') or [result]
+        for attempt in attempts:
+            if attempt.get('error') and attempt.get('usage'):
+                self.charge(model, phase, attempt['usage'])
+        with self.lock:
+            totals = self.totals[(model, phase)]
+            totals['calls'] += 1
+            if result.get('error') or not usage:
+                return
+            totals['responses'] += 1
+            totals['prompt_tokens'] += usage['prompt_tokens']
+            totals['completion_tokens'] += usage['completion_tokens']
+            totals['cost_usd'] += cost
+            totals['generation_time'] += result.get('latency') or 0.0
+            totals['estimated'] += 1 if usage.get('estimated') else 0
+            self.spent += cost
+
+    def charge(self, model: str, phase: str, usage: dict):
+        """Add the tokens and cost of a response that is not kept (hedge loser, failed attempt)."""
+        cost = cost_usd(model, usage['prompt_tokens'], usage['completion_tokens'])
+        with self.lock:
+            totals = self.totals[(model, phase)]
+            totals['discarded'] += 1
+            totals['prompt_tokens'] += usage['prompt_tokens']
+            totals['completion_tokens'] += usage['completion_tokens']
+            totals['cost_usd'] += cost
+            self.spent += cost
+
+    def within_budget(self) -> bool:
+        """False once the run's spend reaches RUN_BUDGET_USD."""
+        with self.lock:
+            return self.budget_usd <= 0 or self.spent < self.budget_usd
+
+    def report(self) -> dict:
+        with self.lock:
+            return {key: dict(totals) for key, totals in self.totals.items()}
+
+
+_tracker = CostTracker()
+
+
+def get_cost_tracker() -> CostTracker:
+    """Return the process-wide cost tracker."""
+    return _tracker
+
+
+def within_budget() -> bool:
+    return _tracker.within_budget()
+
+
+def print_cost_report(tracker: CostTracker = None):
+    """Tokens, tokens/sec and dollars per evaluated response per model and phase."""
+    tracker = tracker or _tracker
+    report = tracker.report()
+    if not report:
+        return
+    print(f"\n💰 Tokens and cost per model and phase:")
+    print(f"   {'model':<34} {'phase':<12} {'resp':>5} {'prompt tok':>11} {'compl tok':>10} "
+          f"{'tok/s':>7} {'cost':>9} {'$/resp':>8}")
+    for (model, phase), t in sorted(report.items()):
+        tokens_per_sec = t['completion_tokens'] / t['generation_time'] if t['generation_time'] > 0 else 0.0
+        per_response = t['cost_usd'] / t['responses'] if t['responses'] else 0.0
+        flag = ' ~' if t['estimated'] else ('  (unpriced)' if price_for(model) is None else '')
+        print(f"   {model:<34} {phase:<12} {t['responses']:>5} {t['prompt_tokens']:>11,} "
+              f"{t['completion_tokens']:>10,} {tokens_per_sec:>7.1f} ${t['cost_usd']:>8.4f} "
+              f"${per_response:>7.4f}{flag}")
+    budget = f" of ${tracker.budget_usd:.4f} budget" if tracker.budget_usd > 0 else ""
+    discarded = sum(t['discarded'] for t in report.values())
+    wasted = f", incl. {discarded} discarded attempts" if discarded else ""
+    print(f"   Total spent: ${tracker.spent:.4f}{budget}{wasted}  (~ = token counts estimated from text)")
+
+
+def estimate_batch_cost(requests: list, batch: bool = True) -> dict:
+    """Expected cost of OpenAI Batch API requests (counted prompt tokens + max_tokens out)."""
+    prompt_tokens = 0
+    completion_tokens = 0
+    cost = 0.0
+    for request in requests:
+        body = request['body']
+        request_prompt = sum(count_tokens(message.get('content')) for message in body['messages'])
+        request_completion = body.get('max_tokens') or 0
+        prompt_tokens += request_prompt
+        completion_tokens += request_completion
+        cost += cost_usd(body['model'], request_prompt, request_completion)
+    if batch:
+        cost *= BATCH_DISCOUNT
+    return {'requests': len(requests), 'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens, 'cost_usd': cost}
@@ -7,6 +7,14 @@ This will create a JSONL file to submit to OpenAI Batch API
 import json
 from pathlib import Path
 
+from batch_builder import print_manifest, write_batch_file
+from cost_tracker import estimate_batch_cost
+from custom_id_codec import decode_custom_id, encode_custom_id
+from token_estimator import TruncationReport, print_truncation_report
+
+# Token budget for the response placed in the judge prompt
+RESPONSE_TOKEN_BUDGET = 2000
+
 # Load Phase 2 data
 with open('results/phase2_final_with_abliterated_scored.json', 'r') as f:
     phase2_data = json.load(f)
@@ -85,7 +93,7 @@ Score guidelines:
 
 # Create batch requests
 batch_requests = []
-request_id = 0
+truncation = TruncationReport()
 
 for task_id in sorted(tasks_by_id.keys()):
     for model_short, model_full in model_mapping.items():
@@ -98,7 +106,7 @@ for task_id in sorted(tasks_by_id.keys()):
                 continue
 
             # Create evaluation request
-            custom_id = f"phase2_contract_{task_id}_{model_full}_{request_id}"
+            custom_id = encode_custom_id('phase2', 'quality', task_id, model_full)
 
             batch_request = {
                 "custom_id": custom_id,
@@ -115,7 +123,7 @@ for task_id in sorted(tasks_by_id.keys()):
                             "role": "user",
                             "content": EVALUATION_PROMPT.format(
                                 task_title=task_data.get('task_title', 'Contract task'),
-                                response=response[:8000]  # Truncate if too long
+                                response=truncation.fit(custom_id, 'response', response, RESPONSE_TOKEN_BUDGET)
                             )
                         }
                     ],
@@ -126,7 +134,6 @@ for task_id in sorted(tasks_by_id.keys()):
             }
 
             batch_requests.append(batch_request)
-            request_id += 1
 
 # Note: Abliterated models already have Phase 2 evaluations, so we skip them
 print(f"\n📝 Note: Abliterated models already evaluated (skipping)")
@@ -138,11 +145,7 @@ print(f"   Expected: ~{len(tasks_by_id)} tasks × 12 models = {len(tasks_by_id)
 from collections import Counter
 model_counts = Counter()
 for req in batch_requests:
-    custom_id = req['custom_id']
-    # Extract model from custom_id
-    parts = custom_id.split('_')
-    model_part = '_'.join(parts[3:-1])  # Everything between task_id and request_id
-    model_counts[model_part] += 1
+    model_counts[decode_custom_id(req['custom_id'])['model']] += 1
 
 print(f"\n📊 Requests by model:")
 for model, count in sorted(model_counts.items()):
@@ -150,25 +153,29 @@ for model, count in sorted(model_counts.items()):
 
 # Save to JSONL file
 output_file = Path('batch_evaluation_jobs/phase2_quality_evaluation_ALL_MODELS.jsonl')
-output_file.parent.mkdir(parents=True, exist_ok=True)
-
-with open(output_file, 'w') as f:
-    for req in batch_requests:
-        f.write(json.dumps(req) + '\n')
+manifest = write_batch_file(output_file, batch_requests)
 
 print(f"\n💾 Saved batch file to: {output_file}")
-print(f"   Total size: {output_file.stat().st_size / 1024:.1f} KB")
-print(f"   Total requests: {len(batch_requests)}")
+print_manifest(manifest)
+print(f"   Total size: {manifest['total_bytes'] / 1024:.1f} KB")
+print(f"   Total requests: {manifest['total_requests']}")
+
+print_truncation_report(truncation)
+truncation_file = output_file.with_name(output_file.stem + '_truncation.json')
+truncation.save(truncation_file)
+print(f"   Per-item report: {truncation_file}")
 
 print("\n" + "="*80)
 print("✅ BATCH FILE CREATED!")
 print("="*80)
 print("\nNext steps:")
-print("1. Upload this file to OpenAI")
+print("1. Upload this file (or each shard in the manifest) to OpenAI")
 print("2. Submit batch job")
 print("3. Wait for completion (~24 hours)")
 print("4. Download results and merge into comprehensive analysis")
 
+estimate = estimate_batch_cost(batch_requests)
 print(f"\n📋 Estimated cost:")
-print(f"   {len(batch_requests)} requests × ~500 tokens × $0.0025/1K = ~${len(batch_requests) * 0.5 * 0.0025:.2f}")
-print(f"   (50% batch discount already applied)")
+print(f"   {estimate['requests']} requests: ~{estimate['prompt_tokens']:,} prompt + "
+      f"≤{estimate['completion_tokens']:,} completion tokens = ~${estimate['cost_usd']:.2f}")
+print(f"   (gpt-4o list price, 50% batch discount already applied)")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+One custom_id format for every Batch API builder and merger.
+A custom_id encodes (phase, dimension, question, model) as
+
+    v1|p1|ap|real_contract_01|qwen3-vl-abliterated:30b
+
+so a merger recovers all four fields with a single split instead of
+guessing where the model name starts. Encoding fails loudly on a field
+containing the separator or an id over MAX_LENGTH, rather than producing
+an id that cannot be decoded. Batch outputs written before the codec
+existed are still decoded through LEGACY_FORMATS.
+"""
+
+import re
+
+VERSION = 'v1'
+SEPARATOR = '|'
+# Kept well under the Batch API's custom_id limit
+MAX_LENGTH = 128
+
+PHASE_CODES = {'phase1': 'p1', 'phase2': 'p2', 'falsereject': 'fr'}
+DIMENSION_CODES = {
+    'actionability': 'ac',
+    'appropriateness': 'ap',
+    'quality': 'q',
+    'falsereject': 'fr'
+}
+PHASES = {code: name for name, code in PHASE_CODES.items()}
+DIMENSIONS = {code: name for name, code in DIMENSION_CODES.items()}
+
+# Layouts used by earlier builders (results/batch_*_output.jsonl), as (regex, phase, dimension)
+LEGACY_FORMATS = [
+    # approp_phase1_qa_0_anthropic/claude-sonnet-4.5_0
+    (re.compile(r'(?P<dim>approp|action)_phase1_qa_(?P<question>\d+)_(?P<model>.+)_\d+$'), 'phase1', None),
+    # approp_falsereject_0_anthropic/claude-sonnet-4.5_1000
+    (re.compile(r'(?P<dim>approp|action)_falsereject_(?P<question>\d+)_(?P<model>.+)_\d+$'), 'falsereject', None),
+    # falsereject_0_anthropic/claude-sonnet-4.5_0
+    (re.compile(r'falsereject_(?P<question>\d+)_(?P<model>.+)_\d+$'), 'falsereject', 'falsereject'),
+    # phase2_contract_contract_001_add_clause_1_anthropic/claude-sonnet-4.5_0
+    (re.compile(r'phase2_contract_(?P<question>.+)_(?P<model>[^_]+/[^_]+)_\d+$'), 'phase2', 'quality'),
+    # gemma3-abliterated:27b___real_contract_01___actionability
+    (re.compile(r'(?P<model>.+?)___(?P<question>.+)___(?P<dim>actionability|appropriateness)$'), 'phase1', None),
+    # gemma3-abliterated:27b___None
+    (re.compile(r'(?P<model>.+?)___(?P<question>.+)$'), 'phase2', 'quality')
+]
+LEGACY_DIMENSIONS = {'approp': 'appropriateness', 'action': 'actionability'}
+
+
+def encode_custom_id(phase: str, dimension: str, question, model: str) -> str:
+    """custom_id for one evaluation request (raises ValueError if it cannot round-trip)."""
+    question = str(question)
+    for field in (question, model):
+        if SEPARATOR in field:
+            raise ValueError(f"custom_id field contains '{SEPARATOR}': {field!r}")
+    custom_id = SEPARATOR.join((VERSION, PHASE_CODES[phase], DIMENSION_CODES[dimension], question, model))
+    if len(custom_id) > MAX_LENGTH:
+        raise ValueError(f"custom_id longer than {MAX_LENGTH} characters: {custom_id!r}")
+    return custom_id
+
+
+def _decode_legacy(custom_id: str):
+    for pattern, phase, dimension in LEGACY_FORMATS:
+        match = pattern.match(custom_id)
+        if match:
+            fields = match.groupdict()
+            dim = dimension or LEGACY_DIMENSIONS.get(fields['dim'], fields.get('dim'))
+            return {'phase': phase, 'dimension': dim,
+                    'question': fields['question'], 'model': fields['model']}
+    return None
+
+
+def decode_custom_id(custom_id: str):
+    """{'phase', 'dimension', 'question', 'model'} for a custom_id, or None if unrecognized."""
+    if custom_id.startswith(VERSION + SEPARATOR):
+        fields = custom_id.split(SEPARATOR)
+        if len(fields) != 5 or fields[1] not in PHASES or fields[2] not in DIMENSIONS:
+            return None
+        return {'phase': PHASES[fields[1]], 'dimension': DIMENSIONS[fields[2]],
+                'question': fields[3], 'model': fields[4]}
+    return _decode_legacy(custom_id)
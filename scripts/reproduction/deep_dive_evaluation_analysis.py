@@ -9,8 +9,48 @@ from pathlib import Path
 from collections import defaultdict, Counter
 import statistics
 
+from pattern_matcher import PatternMatcher
+
 BASE_DIR = Path(__file__).parent.parent
 
+# Keywords to look for
+POSITIVE_KEYWORDS = [
+    'specific', 'concrete', 'actionable', 'clear', 'comprehensive',
+    'detailed', 'practical', 'helpful', 'appropriate', 'well-structured',
+    'accurate', 'thorough', 'professional', 'balanced'
+]
+
+NEGATIVE_KEYWORDS = [
+    'vague', 'generic', 'lacking', 'unclear', 'incomplete', 'missing',
+    'insufficient', 'limited', 'poor', 'weak', 'inadequate', 'fails',
+    'incorrect', 'inappropriate', 'overly'
+]
+
+# Common failure patterns
+FAILURE_PATTERNS = {
+    'no_specifics': ['lacks specific', 'not specific', 'vague', 'generic', 'no concrete'],
+    'missing_disclaimers': ['no disclaimer', 'fails to mention', 'does not advise'],
+    'incorrect_info': ['incorrect', 'inaccurate', 'wrong', 'error'],
+    'incomplete': ['incomplete', 'missing', 'lacks', 'not comprehensive'],
+    'overly_cautious': ['overly cautious', 'too generic', 'refuses to'],
+    'poor_structure': ['poorly structured', 'disorganized', 'unclear'],
+}
+
+# Common success patterns
+SUCCESS_PATTERNS = {
+    'specific_actionable': ['specific', 'actionable', 'concrete steps'],
+    'comprehensive': ['comprehensive', 'thorough', 'detailed'],
+    'appropriate_disclaimers': ['appropriate disclaimer', 'mentions limitations'],
+    'well_structured': ['well-structured', 'organized', 'clear'],
+    'practical': ['practical', 'useful', 'helpful'],
+    'balanced': ['balanced', 'appropriate balance'],
+}
+
+# Each keyword set compiled once into a single matcher
+THEME_MATCHER = PatternMatcher({'positive': POSITIVE_KEYWORDS, 'negative': NEGATIVE_KEYWORDS})
+FAILURE_MATCHER = PatternMatcher(FAILURE_PATTERNS)
+SUCCESS_MATCHER = PatternMatcher(SUCCESS_PATTERNS)
+
 def analyze_justifications(batch_files, dimension_name):
     """Analyze justification patterns from GPT-4o evaluations"""
 
@@ -42,29 +82,14 @@ def analyze_justifications(batch_files, dimension_name):
 def extract_common_themes(justifications):
     """Extract common themes/keywords from justifications"""
 
-    # Keywords to look for
-    positive_keywords = [
-        'specific', 'concrete', 'actionable', 'clear', 'comprehensive',
-        'detailed', 'practical', 'helpful', 'appropriate', 'well-structured',
-        'accurate', 'thorough', 'professional', 'balanced'
-    ]
-
-    negative_keywords = [
-        'vague', 'generic', 'lacking', 'unclear', 'incomplete', 'missing',
-        'insufficient', 'limited', 'poor', 'weak', 'inadequate', 'fails',
-        'incorrect', 'inappropriate', 'overly'
-    ]
-
     positive_counts = Counter()
     negative_counts = Counter()
 
     for just in justifications:
-        text_lower = just.lower()
-        for keyword in positive_keywords:
-            if keyword in text_lower:
+        for label, keyword in THEME_MATCHER.present(just):
+            if label == 'positive':
                 positive_counts[keyword] += 1
-        for keyword in negative_keywords:
-            if keyword in text_lower:
+            else:
                 negative_counts[keyword] += 1
 
     return positive_counts, negative_counts
@@ -98,25 +123,12 @@ def identify_low_scoring_patterns(all_justifications):
 
     low_score_reasons = defaultdict(int)
 
-    # Common failure patterns
-    failure_patterns = {
-        'no_specifics': ['lacks specific', 'not specific', 'vague', 'generic', 'no concrete'],
-        'missing_disclaimers': ['no disclaimer', 'fails to mention', 'does not advise'],
-        'incorrect_info': ['incorrect', 'inaccurate', 'wrong', 'error'],
-        'incomplete': ['incomplete', 'missing', 'lacks', 'not comprehensive'],
-        'overly_cautious': ['overly cautious', 'too generic', 'refuses to'],
-        'poor_structure': ['poorly structured', 'disorganized', 'unclear'],
-    }
-
     low_score_examples = []
 
     for item in all_justifications:
         if item['score'] <= 4:
-            just_lower = item['justification'].lower()
-
-            for pattern_name, keywords in failure_patterns.items():
-                if any(kw in just_lower for kw in keywords):
-                    low_score_reasons[pattern_name] += 1
+            for pattern_name in FAILURE_MATCHER.labels_present(item['justification']):
+                low_score_reasons[pattern_name] += 1
 
             low_score_examples.append({
                 'score': item['score'],
@@ -131,25 +143,12 @@ def identify_high_scoring_patterns(all_justifications):
 
     high_score_reasons = defaultdict(int)
 
-    # Common success patterns
-    success_patterns = {
-        'specific_actionable': ['specific', 'actionable', 'concrete steps'],
-        'comprehensive': ['comprehensive', 'thorough', 'detailed'],
-        'appropriate_disclaimers': ['appropriate disclaimer', 'mentions limitations'],
-        'well_structured': ['well-structured', 'organized', 'clear'],
-        'practical': ['practical', 'useful', 'helpful'],
-        'balanced': ['balanced', 'appropriate balance'],
-    }
-
     high_score_examples = []
 
     for item in all_justifications:
         if item['score'] >= 8:
-            just_lower = item['justification'].lower()
-
-            for pattern_name, keywords in success_patterns.items():
-                if any(kw in just_lower for kw in keywords):
-                    high_score_reasons[pattern_name] += 1
+            for pattern_name in SUCCESS_MATCHER.labels_present(item['justification']):
+                high_score_reasons[pattern_name] += 1
 
             high_score_examples.append({
                 'score': item['score'],
@@ -9,6 +9,12 @@ import json
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from batch_poller import watch_batches
+from merge_all_models_evaluations import save_scores
+from merge_engine import MergeIndex
+from results_db import write_results_db
+from results_table import build_rows, write_results_table
+
 # Load environment variables
 load_dotenv()
 
@@ -21,114 +27,47 @@ BATCH_CONFIGS = {
         "name": "appropriateness_all_models",
         "dimension": "appropriateness",
         "output_file": "results/batch_appropriateness_all_models_output.jsonl",
-        "error_file": "results/batch_appropriateness_all_models_error.jsonl"
+        "error_file": "results/batch_appropriateness_all_models_error.jsonl",
+        "merge": ("phase1", "appropriateness")
     },
     "batch_690da41208cc8190b95a6fd9c3ffd5e0": {
         "name": "actionability_all_models",
         "dimension": "actionability",
         "output_file": "results/batch_actionability_all_models_output.jsonl",
-        "error_file": "results/batch_actionability_all_models_error.jsonl"
+        "error_file": "results/batch_actionability_all_models_error.jsonl",
+        "merge": ("phase1", "actionability")
     },
     "batch_690da414dfd88190b917d9d5f7cf5a43": {
         "name": "falsereject_all_models",
         "dimension": "falsereject_evaluation",
         "output_file": "results/batch_falsereject_all_models_output.jsonl",
-        "error_file": "results/batch_falsereject_all_models_error.jsonl"
+        "error_file": "results/batch_falsereject_all_models_error.jsonl",
+        "merge": ("falsereject", "falsereject")
     }
 }
 
-def download_batch_results(batch_id, config):
-    """Download batch results from OpenAI"""
-    print(f"\n{'='*80}")
-    print(f"Processing: {config['name']}")
-    print(f"Batch ID: {batch_id}")
-    print(f"{'='*80}")
-
-    try:
-        # Get batch info
-        batch = client.batches.retrieve(batch_id)
-        print(f"Status: {batch.status}")
-        print(f"Created: {batch.created_at}")
-        print(f"Request counts: {batch.request_counts}")
-
-        if batch.status != "completed":
-            print(f"⚠️  Batch not completed yet. Status: {batch.status}")
-            return False
-
-        # Download output file
-        if batch.output_file_id:
-            print(f"\n📥 Downloading output file: {batch.output_file_id}")
-            output_content = client.files.content(batch.output_file_id)
-
-            with open(config['output_file'], 'wb') as f:
-                f.write(output_content.read())
-
-            print(f"✅ Saved to: {config['output_file']}")
-
-            # Count lines
-            with open(config['output_file'], 'r') as f:
-                line_count = sum(1 for _ in f)
-            print(f"   Total evaluations: {line_count}")
-
-        # Download error file if exists
-        if batch.error_file_id:
-            print(f"\n⚠️  Downloading error file: {batch.error_file_id}")
-            error_content = client.files.content(batch.error_file_id)
-
-            with open(config['error_file'], 'wb') as f:
-                f.write(error_content.read())
-
-            print(f"   Saved to: {config['error_file']}")
-
-            # Count errors
-            with open(config['error_file'], 'r') as f:
-                error_count = sum(1 for _ in f)
-            print(f"   Total errors: {error_count}")
-
-        return True
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
-
-def analyze_downloaded_data(config):
+def analyze_downloaded_data(config, models_found):
     """Quick analysis of downloaded data"""
     print(f"\n📊 Analyzing {config['name']}...")
-
-    try:
-        with open(config['output_file'], 'r') as f:
-            lines = f.readlines()
-
-        # Sample first evaluation
-        first_eval = json.loads(lines[0])
-        print(f"\nSample evaluation structure:")
-        print(f"  Keys: {list(first_eval.keys())}")
-
-        if 'response' in first_eval:
-            resp = first_eval['response']
-            if 'body' in resp:
-                body = resp['body']
-                if 'choices' in body:
-                    content = body['choices'][0]['message']['content']
-                    print(f"  Sample content (first 200 chars):")
-                    print(f"  {content[:200]}...")
-
-        # Count by model (if custom_id contains model name)
-        models_found = set()
-        for line in lines:
-            data = json.loads(line)
-            custom_id = data.get('custom_id', '')
-            # Extract model from custom_id (format may vary)
-            if '_model_' in custom_id:
-                model = custom_id.split('_model_')[1].split('_')[0]
-                models_found.add(model)
-
-        print(f"\n  Models found in evaluations: {len(models_found)}")
-        if models_found:
-            print(f"  Models: {sorted(models_found)}")
-
-    except Exception as e:
-        print(f"  Error analyzing: {e}")
+    with open(config['output_file'], 'r') as f:
+        first_line = f.readline()
+    if not first_line.strip():
+        print("  No evaluations in output file")
+        return
+
+    # Sample first evaluation
+    first_eval = json.loads(first_line)
+    print(f"\nSample evaluation structure:")
+    print(f"  Keys: {list(first_eval.keys())}")
+    body = first_eval.get('response', {}).get('body') or {}
+    if 'choices' in body:
+        content = body['choices'][0]['message']['content']
+        print(f"  Sample content (first 200 chars):")
+        print(f"  {content[:200]}...")
+
+    print(f"\n  Models found in evaluations: {len(models_found)}")
+    for model, count in sorted(models_found.items()):
+        print(f"    {model}: {count}")
 
 def main():
     print("="*80)
@@ -137,17 +76,30 @@ def main():
     print("\nThese batches contain GPT-4o evaluation scores for ALL 12 models")
     print("on Phase 1 (actionability, appropriateness) and FalseReject benchmarks.\n")
 
-    # Download all batches
-    success_count = 0
-    for batch_id, config in BATCH_CONFIGS.items():
-        if download_batch_results(batch_id, config):
-            success_count += 1
-            analyze_downloaded_data(config)
+    index = MergeIndex()
+
+    def merge_completed(batch_id, config, summary):
+        """Index a batch as soon as it is downloaded, while the others keep running"""
+        phase, dimension = config['merge']
+        indexed = index.add_file(config['output_file'], phase, dimension)
+        analyze_downloaded_data(config, indexed['models'])
+
+    # Poll all batches at once; each is streamed to disk and indexed when it completes
+    summaries = watch_batches(client, BATCH_CONFIGS, on_complete=merge_completed)
+    success_count = sum(1 for summary in summaries.values() if summary['status'] == 'completed')
 
     print(f"\n{'='*80}")
     print(f"✅ Successfully downloaded {success_count}/{len(BATCH_CONFIGS)} batches")
     print(f"{'='*80}")
 
+    if success_count == len(BATCH_CONFIGS):
+        save_scores(index)
+        rows = build_rows()
+        write_results_table(rows)
+        write_results_db(rows)
+    else:
+        print("\n⚠️  Not all batches completed; merged score files were not updated")
+
     print("\n📋 Next Steps:")
     print("1. Merge these evaluations into phase1_final_with_abliterated_scored.json")
     print("2. Update falsereject_analysis_with_abliterated.json with evaluation scores")
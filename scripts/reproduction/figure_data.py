@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Shared, cached data access for the figure scripts.
+Each source file (results JSON, batch output JSONL) is parsed at most once:
+the parsed form is pickled to FIGURE_CACHE_DIR, keyed by the file's path,
+and reused while the file keeps its mtime and size. If those change but
+the content hash does not (a checkout or touch), the cache entry is kept.
+Within a process the pickled bytes are also memoized, and every call
+returns a fresh copy, so a script that edits its data cannot change what
+the next figure sees.
+
+FIGURE_CACHE: "on" (default) or "off" (no disk cache; still parsed once per process)
+
+Run from the repository root to prime the cache for everything in results/:
+    python scripts/reproduction/figure_data.py
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from collections import Counter
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("FIGURE_CACHE_DIR", "results/figure_cache"))
+CACHE_MODE = os.getenv("FIGURE_CACHE", "on")
+# Bump when a parsed layout changes so old cache entries are ignored
+CACHE_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+# (kind, resolved path) -> ((mtime_ns, size), pickled data)
+_memory = {}
+STATS = Counter()
+
+
+def _signature(path: Path) -> tuple:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_file(kind: str, path: Path) -> Path:
+    name = hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f"{path.stem}.{kind}.{name}.pkl"
+
+
+def _write_cache(cache_file: Path, entry: dict):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temporary name so concurrent figure processes never interleave writes
+    partial = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.part")
+    with open(partial, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    partial.replace(cache_file)
+
+
+def _read_cache(cache_file: Path, path: Path, signature: tuple):
+    """Pickled data from a still-valid cache entry, else None."""
+    try:
+        with open(cache_file, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if entry.get('version') != CACHE_VERSION or entry.get('source') != str(path):
+        return None
+    if (entry['mtime_ns'], entry['size']) == signature:
+        return entry['payload']
+    if entry['size'] == signature[1] and entry['sha256'] == _digest(path):
+        # Same content under a new mtime: keep the entry and record the new mtime
+        entry['mtime_ns'] = signature[0]
+        _write_cache(cache_file, entry)
+        return entry['payload']
+    return None
+
+
+def _cached(kind: str, path, parse):
+    path = Path(path).resolve()
+    signature = _signature(path)
+    key = (kind, str(path))
+    memo = _memory.get(key)
+    if memo and memo[0] == signature:
+        STATS['memory'] += 1
+        return pickle.loads(memo[1])
+
+    cache_file = _cache_file(kind, path)
+    payload = _read_cache(cache_file, path, signature) if CACHE_MODE != 'off' else None
+    if payload is not None:
+        STATS['disk'] += 1
+    else:
+        STATS['parsed'] += 1
+        payload = pickle.dumps(parse(path), protocol=pickle.HIGHEST_PROTOCOL)
+        if CACHE_MODE != 'off':
+            _write_cache(cache_file, {
+                'version': CACHE_VERSION,
+                'source': str(path),
+                'mtime_ns': signature[0],
+                'size': signature[1],
+                'sha256': _digest(path),
+                'payload': payload
+            })
+    _memory[key] = (signature, payload)
+    return pickle.loads(payload)
+
+
+def _parse_json(path: Path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _parse_jsonl(path: Path) -> list:
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _parse_judge_outputs(path: Path) -> list:
+    outputs = []
+    for record in _parse_jsonl(path):
+        try:
+            content = record['response']['body']['choices'][0]['message']['content']
+            judgment = json.loads(content)
+        except Exception:
+            judgment = None
+        outputs.append((record.get('custom_id'), judgment))
+    return outputs
+
+
+def load_json(path):
+    """Parsed JSON file."""
+    return _cached('json', path, _parse_json)
+
+
+def load_jsonl(path) -> list:
+    """Parsed JSONL records."""
+    return _cached('jsonl', path, _parse_jsonl)
+
+
+def load_judge_outputs(path) -> list:
+    """[(custom_id, judge JSON or None if unparseable)] from a Batch API output file."""
+    return _cached('judge', path, _parse_judge_outputs)
+
+
+def judge_scores(path, field: str = 'score', default=0) -> list:
+    """field of every parseable judgment in a Batch API output file, in file order."""
+    return [judgment.get(field, default) for _, judgment in load_judge_outputs(path) if judgment is not None]
+
+
+def print_cache_stats():
+    print(f"🗂️  Figure data: {STATS['parsed']} parsed, {STATS['disk']} from cache, "
+          f"{STATS['memory']} from memory ({CACHE_DIR})")
+
+
+def main():
+    print("="*80)
+    print("PRIMING FIGURE DATA CACHE")
+    print("="*80)
+    start_time = time.perf_counter()
+    for path in sorted(Path('results').glob('*.json')):
+        load_json(path)
+    for path in sorted(Path('results').glob('batch_*_output.jsonl')):
+        load_judge_outputs(path)
+    print_cache_stats()
+    print(f"   {time.perf_counter() - start_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
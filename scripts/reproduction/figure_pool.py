@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Parallel figure rendering for the figure scripts.
+The figures of one script do not depend on each other, so render_figures()
+calls each figure function in its own worker of a process pool (one per
+core unless FIGURE_WORKERS says otherwise). The data the figures read is
+loaded through figure_data before the pool starts: forked workers inherit
+the parsed data, and spawned ones read figure_data's on-disk cache instead
+of re-parsing. Each figure's render time is reported as it finishes.
+
+FIGURE_WORKERS: worker processes (default: CPU count; 1 renders in-process, in order)
+"""
+
+import importlib
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import figure_data
+
+FIGURE_WORKERS = int(os.getenv("FIGURE_WORKERS", "0")) or os.cpu_count() or 1
+
+# Figures are only saved to files; spawned workers read this when they import matplotlib
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+
+def _render(module_name: str, figure: str) -> dict:
+    """Run one figure function; errors are returned rather than raised so the others still render."""
+    start_time = time.perf_counter()
+    try:
+        getattr(importlib.import_module(module_name), figure)()
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return {'figure': figure, 'seconds': time.perf_counter() - start_time, 'error': error}
+
+
+def preload(paths):
+    """Parse the figures' data once, before the pool starts."""
+    for path in paths:
+        try:
+            figure_data.load_json(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not preload {path}: {e}")
+
+
+def render_figures(module_name: str, figures: list, data_sources=(), workers: int = FIGURE_WORKERS) -> list:
+    """Render module_name's figure functions (by name) in parallel; returns one result per figure.
+
+    Each result has 'figure', 'seconds' and 'error' (a traceback, or None).
+    """
+    preload(data_sources)
+    workers = max(1, min(workers, len(figures)))
+    print(f"\n🧵 Rendering {len(figures)} figures with {workers} worker{'s' if workers > 1 else ''}")
+
+    start_time = time.perf_counter()
+    results = []
+    if workers == 1:
+        for figure in figures:
+            results.append(_render(module_name, figure))
+            _print_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, module_name, figure) for figure in figures]
+            for future in as_completed(futures):
+                results.append(future.result())
+                _print_result(results[-1])
+    elapsed = time.perf_counter() - start_time
+
+    results.sort(key=lambda result: figures.index(result['figure']))
+    print_render_times(results, elapsed)
+    return results
+
+
+def _print_result(result: dict):
+    if result['error']:
+        print(f"❌ {result['figure']} failed after {result['seconds']:.2f}s:\n{result['error']}")
+    else:
+        print(f"⏱️  {result['figure']}: {result['seconds']:.2f}s")
+
+
+def print_render_times(results: list, elapsed: float):
+    print("\n⏱️  Figure render times:")
+    for result in results:
+        status = 'failed' if result['error'] else 'ok'
+        print(f"   {result['figure']:<45} {result['seconds']:7.2f}s  {status}")
+    print(f"   {'wall clock':<45} {elapsed:7.2f}s  (figures sum to {sum(result['seconds'] for result in results):.2f}s)")
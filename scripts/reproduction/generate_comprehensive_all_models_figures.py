@@ -4,12 +4,13 @@ Generate comprehensive figures with ALL 12 models (10 standard + 2 abliterated)
 Data groups: Phase1 (100 questions), FalseReject (24), Contracts (39 tasks)
 """
 
-import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 from pathlib import Path
 
+from figure_data import judge_scores, load_json
+
 # Set publication-quality defaults
 plt.rcParams['figure.dpi'] = 300
 plt.rcParams['savefig.dpi'] = 300
@@ -26,50 +27,22 @@ OUTPUT_DIR = Path('reports/paper/overleaf/figures')
 def load_all_data():
     """Load all evaluation data"""
     # Phase 1 scores (ALL 10 standard models)
-    with open('results/phase1_all_models_eval_scores.json', 'r') as f:
-        phase1_standard = json.load(f)
+    phase1_standard = load_json('results/phase1_all_models_eval_scores.json')
 
     # Phase 1 scores for abliterated models
-    with open('results/phase1_final_with_abliterated.json', 'r') as f:
-        phase1_all = json.load(f)
+    phase1_all = load_json('results/phase1_final_with_abliterated.json')
 
     # Get abliterated scores from batch files
-    gemma_action = []
-    gemma_approp = []
-    qwen_action = []
-    qwen_approp = []
-
-    with open('results/batch_actionability_gemma3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            gemma_action.append(resp.get('score', 0))  # Fixed: use 'score' not 'actionability_score'
-
-    with open('results/batch_appropriateness_gemma3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            gemma_approp.append(resp.get('score', 0))  # Fixed: use 'score' not 'appropriateness_score'
-
-    with open('results/batch_actionability_qwen3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            qwen_action.append(resp.get('score', 0))  # Fixed: use 'score' not 'actionability_score'
-
-    with open('results/batch_appropriateness_qwen3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            qwen_approp.append(resp.get('score', 0))  # Fixed: use 'score' not 'appropriateness_score'
+    gemma_action = judge_scores('results/batch_actionability_gemma3_output.jsonl')  # Fixed: use 'score' not 'actionability_score'
+    gemma_approp = judge_scores('results/batch_appropriateness_gemma3_output.jsonl')  # Fixed: use 'score' not 'appropriateness_score'
+    qwen_action = judge_scores('results/batch_actionability_qwen3_output.jsonl')  # Fixed: use 'score' not 'actionability_score'
+    qwen_approp = judge_scores('results/batch_appropriateness_qwen3_output.jsonl')  # Fixed: use 'score' not 'appropriateness_score'
 
     # FalseReject scores
-    with open('results/falsereject_all_models_eval_scores.json', 'r') as f:
-        falsereject_standard = json.load(f)
+    falsereject_standard = load_json('results/falsereject_all_models_eval_scores.json')
 
     # FalseReject refusal rates
-    with open('results/falsereject_analysis_with_abliterated.json', 'r') as f:
-        falsereject_refusal = json.load(f)
+    falsereject_refusal = load_json('results/falsereject_analysis_with_abliterated.json')
 
     return {
         'phase1_standard': phase1_standard,
@@ -7,12 +7,13 @@ Fixes:
 3. Add Phase 2 contracts data
 """
 
-import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 from pathlib import Path
 
+from figure_data import judge_scores, load_json
+
 # Set publication-quality defaults
 plt.rcParams['figure.dpi'] = 300
 plt.rcParams['savefig.dpi'] = 300
@@ -29,65 +30,25 @@ OUTPUT_DIR = Path('reports/paper/overleaf/figures')
 def load_all_data():
     """Load all evaluation data including Phase 2"""
     # Phase 1 scores (ALL 10 standard models)
-    with open('results/phase1_all_models_eval_scores.json', 'r') as f:
-        phase1_standard = json.load(f)
+    phase1_standard = load_json('results/phase1_all_models_eval_scores.json')
 
     # Phase 1 abliterated scores
-    gemma_action = []
-    gemma_approp = []
-    qwen_action = []
-    qwen_approp = []
-
-    with open('results/batch_actionability_gemma3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            gemma_action.append(resp.get('score', 0))
-
-    with open('results/batch_appropriateness_gemma3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            gemma_approp.append(resp.get('score', 0))
-
-    with open('results/batch_actionability_qwen3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            qwen_action.append(resp.get('score', 0))
-
-    with open('results/batch_appropriateness_qwen3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            qwen_approp.append(resp.get('score', 0))
+    gemma_action = judge_scores('results/batch_actionability_gemma3_output.jsonl')
+    gemma_approp = judge_scores('results/batch_appropriateness_gemma3_output.jsonl')
+    qwen_action = judge_scores('results/batch_actionability_qwen3_output.jsonl')
+    qwen_approp = judge_scores('results/batch_appropriateness_qwen3_output.jsonl')
 
     # FalseReject
-    with open('results/falsereject_all_models_eval_scores.json', 'r') as f:
-        falsereject_standard = json.load(f)
+    falsereject_standard = load_json('results/falsereject_all_models_eval_scores.json')
 
-    with open('results/falsereject_analysis_with_abliterated.json', 'r') as f:
-        falsereject_refusal = json.load(f)
+    falsereject_refusal = load_json('results/falsereject_analysis_with_abliterated.json')
 
     # Phase 2 (Contracts)
-    with open('results/phase2_final_with_abliterated_scored.json', 'r') as f:
-        phase2_data = json.load(f)
+    phase2_data = load_json('results/phase2_final_with_abliterated_scored.json')
 
     # Phase 2 abliterated quality scores
-    gemma_phase2 = []
-    qwen_phase2 = []
-
-    with open('results/batch_quality_gemma3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            gemma_phase2.append(resp.get('score', 0))
-
-    with open('results/batch_quality_qwen3_output.jsonl', 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            resp = json.loads(data['response']['body']['choices'][0]['message']['content'])
-            qwen_phase2.append(resp.get('score', 0))
+    gemma_phase2 = judge_scores('results/batch_quality_gemma3_output.jsonl')
+    qwen_phase2 = judge_scores('results/batch_quality_qwen3_output.jsonl')
 
     return {
         'phase1_standard': phase1_standard,
@@ -8,13 +8,15 @@ Following user's insight framework:
 - Work types: Light (Phase1+FalseReject), Heavy (Phase2), Low-risk (Phase1+Phase2), High-risk (FalseReject)
 """
 
-import json
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import defaultdict
 import os
 
+from figure_data import load_json
+from results_table import read_results
+
 # Set publication-quality style
 plt.rcParams['figure.dpi'] = 300
 plt.rcParams['savefig.dpi'] = 300
@@ -34,10 +36,16 @@ print("="*80)
 
 # Load all datasets
 print("\n📥 Loading datasets...")
-phase1_data = json.load(open('results/phase1_all_models_eval_scores.json'))
+# Phase 1 per-question scores from the results table (only these columns and rows are read)
+phase1_table = read_results(columns=['model', 'question_id', 'dimension', 'score'],
+                            filters=[('phase', '==', 'phase1')])
+phase1_questions = defaultdict(lambda: defaultdict(dict))
+for model, q_id, dimension, score in zip(*phase1_table.values()):
+    phase1_questions[model][q_id][dimension] = score
+phase1_data = {'scores_by_model': phase1_questions}
 # IMPORTANT: Use CORRECT FalseReject data (regex-based), NOT GPT-4o evals
-falsereject_analysis = json.load(open('results/falsereject_analysis.json'))
-phase2_data = json.load(open('results/phase2_all_models_eval_scores.json'))
+falsereject_analysis = load_json('results/falsereject_analysis.json')
+phase2_data = load_json('results/phase2_all_models_eval_scores.json')
 
 # Check if abliterated models already in Phase1, if not add them from Phase2
 print("\n🔄 Ensuring abliterated models in all datasets...")
@@ -90,8 +98,8 @@ def calculate_phase1_score(model_data):
         for q_id, q_data in model_data.items():
             if q_id.isdigit():  # Question ID
                 if 'appropriateness' in q_data and 'actionability' in q_data:
-                    approp = q_data['appropriateness'].get('appropriateness_score', 0)
-                    action = q_data['actionability'].get('actionability_score', 0)
+                    approp = q_data['appropriateness'] or 0
+                    action = q_data['actionability'] or 0
                     all_scores.append((approp + action) / 2)
         return np.mean(all_scores) if all_scores else 0
 
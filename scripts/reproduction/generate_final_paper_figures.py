@@ -4,7 +4,6 @@ Generate final publication-ready figures based on comprehensive analysis
 ALL models, ALL data, honest about what we can/cannot claim
 """
 
-import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
@@ -12,6 +11,9 @@ from pathlib import Path
 import seaborn as sns
 from collections import defaultdict
 
+from figure_data import load_json
+from figure_pool import render_figures
+
 # Set publication-quality style
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_context("paper", font_scale=1.2)
@@ -36,8 +38,7 @@ def generate_figure1_utility_crisis():
 
     print("\n📊 Generating Figure 1: The Utility Crisis (FalseReject - 12 Models)...")
 
-    with open(RESULTS_DIR / "falsereject_analysis_with_abliterated.json") as f:
-        data = json.load(f)
+    data = load_json(RESULTS_DIR / "falsereject_analysis_with_abliterated.json")
 
     # Extract data
     models = []
@@ -590,6 +591,19 @@ def generate_figure7_unanswered_question():
 # MAIN EXECUTION
 #==============================================================================
 
+FIGURES = [
+    'generate_figure1_utility_crisis',
+    'generate_figure2_abliterated_quality',
+    'generate_figure3_appropriateness_paradox',
+    'generate_figure4_wrong_optimization',
+    'generate_figure5_success_factors',
+    'generate_figure6_task_adaptive',
+    'generate_figure7_unanswered_question'
+]
+
+# Files the figures read, parsed once before the workers start
+DATA_SOURCES = [RESULTS_DIR / "falsereject_analysis_with_abliterated.json"]
+
 def main():
     print("=" * 80)
     print("🎨 GENERATING FINAL PUBLICATION-READY FIGURES")
@@ -597,42 +611,34 @@ def main():
     print("=" * 80)
     print(f"\nOutput directory: {FIGURES_DIR}")
 
-    try:
-        generate_figure1_utility_crisis()
-        generate_figure2_abliterated_quality()
-        generate_figure3_appropriateness_paradox()
-        generate_figure4_wrong_optimization()
-        generate_figure5_success_factors()
-        generate_figure6_task_adaptive()
-        generate_figure7_unanswered_question()
-
-        print("\n" + "=" * 80)
-        print("✅ ALL FIGURES GENERATED SUCCESSFULLY!")
-        print("=" * 80)
-        print(f"\nTotal figures: 7 (14 files with PNG + PDF)")
-        print(f"Location: {FIGURES_DIR}")
-
-        print("\n📊 FIGURES:")
-        print("  1. figure1_utility_crisis - FalseReject (ALL 12 models) ⭐⭐⭐⭐⭐")
-        print("  2. figure2_abliterated_quality - Quality maintenance ⭐⭐⭐⭐⭐")
-        print("  3. figure3_appropriateness_paradox - 8:1 ratio ⭐⭐⭐⭐")
-        print("  4. figure4_wrong_optimization - 1.4% disclaimers ⭐⭐⭐⭐")
-        print("  5. figure5_success_factors - Specificity vs disclaimers ⭐⭐⭐⭐")
-        print("  6. figure6_task_adaptive - Variance analysis ⭐⭐⭐")
-        print("  7. figure7_unanswered_question - Honest limitations ⭐⭐⭐⭐")
-
-        print("\n✨ Ready for paper submission!")
-        print("   - Honest about data limitations")
-        print("   - Based on comprehensive analysis")
-        print("   - Strong findings where we have data")
-        print("=" * 80)
-
-    except Exception as e:
-        print(f"\n❌ Error generating figures: {e}")
-        import traceback
-        traceback.print_exc()
+    # Independent figures, rendered across a process pool (FIGURE_WORKERS)
+    results = render_figures(Path(__file__).stem, FIGURES, data_sources=DATA_SOURCES)
+    failed = [result['figure'] for result in results if result['error']]
+    if failed:
+        print(f"\n❌ Error generating figures: {', '.join(failed)}")
         return 1
 
+    print("\n" + "=" * 80)
+    print("✅ ALL FIGURES GENERATED SUCCESSFULLY!")
+    print("=" * 80)
+    print(f"\nTotal figures: 7 (14 files with PNG + PDF)")
+    print(f"Location: {FIGURES_DIR}")
+
+    print("\n📊 FIGURES:")
+    print("  1. figure1_utility_crisis - FalseReject (ALL 12 models) ⭐⭐⭐⭐⭐")
+    print("  2. figure2_abliterated_quality - Quality maintenance ⭐⭐⭐⭐⭐")
+    print("  3. figure3_appropriateness_paradox - 8:1 ratio ⭐⭐⭐⭐")
+    print("  4. figure4_wrong_optimization - 1.4% disclaimers ⭐⭐⭐⭐")
+    print("  5. figure5_success_factors - Specificity vs disclaimers ⭐⭐⭐⭐")
+    print("  6. figure6_task_adaptive - Variance analysis ⭐⭐⭐")
+    print("  7. figure7_unanswered_question - Honest limitations ⭐⭐⭐⭐")
+
+    print("\n✨ Ready for paper submission!")
+    print("   - Honest about data limitations")
+    print("   - Based on comprehensive analysis")
+    print("   - Strong findings where we have data")
+    print("=" * 80)
+
     return 0
 
 if __name__ == "__main__":
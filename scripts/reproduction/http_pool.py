@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client layer for the model callers.
+One pooled keep-alive session per host (HTTP/2 through httpx when enabled
+and installed) and one cached OpenAI client per API key, so repeated calls
+skip the TCP/TLS handshake.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host; should be >= the runner's concurrency
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+# Set HTTP2=1 to use httpx with HTTP/2 (needs `pip install httpx[http2]`)
+USE_HTTP2 = os.getenv("HTTP2") == "1"
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_sessions = {}
+_openai_clients = {}
+_lock = threading.Lock()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url: str):
+    """Return the pooled session for the host of url (created on first use)."""
+    host = _host_key(url)
+    with _lock:
+        if host not in _sessions:
+            if USE_HTTP2 and HTTP2_AVAILABLE:
+                session = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+                )
+            else:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount(host, adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+def post_json(url: str, headers: dict, payload: dict, timeout: float):
+    """POST a JSON payload over the pooled session for url's host.
+
+    Returns the requests/httpx response; both expose status_code, headers,
+    text and json().
+    """
+    return get_session(url).post(url, headers=headers, json=payload, timeout=timeout)
+
+
+@contextmanager
+def stream_post(url: str, headers: dict, payload: dict, timeout: float):
+    """POST over the pooled session and yield the response unread, for streaming."""
+    session = get_session(url)
+    if isinstance(session, requests.Session):
+        response = session.post(url, headers=headers, json=payload, timeout=timeout, stream=True)
+        # SSE is UTF-8; requests would otherwise assume ISO-8859-1 for text/*
+        response.encoding = 'utf-8'
+        try:
+            yield response
+        finally:
+            response.close()
+    else:
+        with session.stream('POST', url, headers=headers, json=payload, timeout=timeout) as response:
+            yield response
+
+
+def iter_lines(response):
+    """Decoded lines of a streaming requests/httpx response."""
+    if isinstance(response, requests.Response):
+        yield from response.iter_lines(decode_unicode=True)
+    else:
+        yield from response.iter_lines()
+
+
+def read_text(response) -> str:
+    """Full body of a streaming requests/httpx response (for error messages)."""
+    if not isinstance(response, requests.Response):
+        response.read()
+    return response.text
+
+
+def get_openai_client(api_key: str, **kwargs):
+    """Return a cached OpenAI client (its httpx pool is reused across calls)."""
+    from openai import OpenAI
+
+    key = (api_key, tuple(sorted(kwargs.items())))
+    with _lock:
+        if key not in _openai_clients:
+            _openai_clients[key] = OpenAI(api_key=api_key, **kwargs)
+        return _openai_clients[key]
+
+
+def close_all():
+    """Close every pooled session and cached client."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        for client in _openai_clients.values():
+            client.close()
+        _sessions.clear()
+        _openai_clients.clear()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Per-(model, phase) latency tracking for adaptive timeouts and hedged requests.
+Once a model has enough observed latencies in a phase, its request timeout
+there shrinks from the fixed default to a multiple of its p99, so a hung
+call no longer blocks a slot for minutes. With HEDGE_REQUESTS=1 a call
+still running past its p95 gets a duplicate request and the first
+successful answer wins.
+"""
+
+import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from results_journal import read_journal
+from scheduler import percentile
+
+# Set ADAPTIVE_TIMEOUTS=0 to always use the callers' fixed timeouts
+ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "1") == "1"
+# Timeout = TIMEOUT_MULTIPLIER x p99, never below TIMEOUT_FLOOR or above the fixed default
+TIMEOUT_MULTIPLIER = float(os.getenv("TIMEOUT_MULTIPLIER", "3"))
+TIMEOUT_FLOOR = float(os.getenv("TIMEOUT_FLOOR", "30"))
+# Latencies needed before a model's percentiles are trusted
+MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "20"))
+# Latencies kept per (model, phase)
+WINDOW = 500
+
+# Set HEDGE_REQUESTS=1 to send a duplicate once a call exceeds HEDGE_PERCENTILE
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS") == "1"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='hedge')
+
+
+class LatencyTracker:
+    """Thread-safe rolling latency window and hedge/timeout counters per (model, phase).
+
+    Phases are tracked apart because their prompts and answers differ in
+    length (a Phase 2 contract task takes far longer than a Phase 1 question).
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(lambda: deque(maxlen=WINDOW))
+        self.run_latencies = defaultdict(list)
+        self.timeouts = defaultdict(int)
+        self.hedges = defaultdict(int)
+        self.hedge_wins = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, model: str, latency: float, this_run: bool = True, phase: str = None):
+        with self.lock:
+            self.latencies[(model, phase)].append(latency)
+            if this_run:
+                self.run_latencies[(model, phase)].append(latency)
+
+    def record_timeout(self, model: str, phase: str = None):
+        with self.lock:
+            self.timeouts[(model, phase)] += 1
+
+    def record_hedge(self, model: str, won: bool, phase: str = None):
+        with self.lock:
+            self.hedges[(model, phase)] += 1
+            if won:
+                self.hedge_wins[(model, phase)] += 1
+
+    def percentile(self, model: str, pct: float, phase: str = None):
+        """Latency percentile for (model, phase), or None until MIN_SAMPLES are seen."""
+        with self.lock:
+            window = list(self.latencies[(model, phase)])
+        if len(window) < MIN_SAMPLES:
+            return None
+        return percentile(window, pct)
+
+    def timeout_for(self, model: str, default: float, phase: str = None) -> float:
+        """Adaptive request timeout for (model, phase), capped at the caller's default."""
+        if not ADAPTIVE_TIMEOUTS:
+            return default
+        p99 = self.percentile(model, 99, phase)
+        if p99 is None:
+            return default
+        return min(default, max(TIMEOUT_FLOOR, p99 * TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, model: str, phase: str = None):
+        """Seconds after which a call gets a duplicate (None = no hedging)."""
+        if not HEDGE_REQUESTS:
+            return None
+        return self.percentile(model, HEDGE_PERCENTILE, phase)
+
+    def seed_from_journal(self, journal_file) -> int:
+        """Prime the windows with successful latencies from an earlier run."""
+        seeded = 0
+        for record in read_journal(journal_file):
+            result = record.get('result') or {}
+            if not result.get('error') and not result.get('cached') and result.get('latency'):
+                self.record(record['model'], result['latency'], this_run=False, phase=record.get('benchmark'))
+                seeded += 1
+        return seeded
+
+    def tail_report(self) -> dict:
+        """Per-(model, phase) percentiles and the wall-clock cost of calls beyond p95."""
+        with self.lock:
+            run_latencies = {key: list(values) for key, values in self.run_latencies.items()}
+            for key in self.timeouts:
+                run_latencies.setdefault(key, [])
+        report = {}
+        for key, values in run_latencies.items():
+            p95 = percentile(values, 95)
+            tail = [latency - p95 for latency in values if latency > p95]
+            report[key] = {
+                'calls': len(values),
+                'p50': percentile(values, 50),
+                'p95': p95,
+                'p99': percentile(values, 99),
+                'max': max(values, default=0.0),
+                'total': sum(values),
+                'tail_excess': sum(tail),
+                'timeouts': self.timeouts[key],
+                'hedges': self.hedges[key],
+                'hedge_wins': self.hedge_wins[key]
+            }
+        return report
+
+
+_tracker = LatencyTracker()
+
+
+def get_tracker() -> LatencyTracker:
+    """Return the process-wide latency tracker."""
+    return _tracker
+
+
+def _failed(future) -> bool:
+    """Whether a finished copy raised or returned a non-200 response."""
+    if future.exception() is not None:
+        return True
+    return getattr(future.result(), 'status_code', 200) != 200
+
+
+def _discard(on_discard, future):
+    if not _failed(future):
+        on_discard(future.result())
+
+
+def hedged_call(model: str, send, default_timeout: float, on_hedge=None, hedge: bool = True,
+                phase: str = None, on_discard=None):
+    """Run send(timeout) with an adaptive timeout, hedging past the (model, phase) p95.
+
+    on_hedge() runs before the duplicate is sent (e.g. to take a rate-limit
+    token); pass hedge=False for calls that must not be duplicated. Returns
+    the first successful response. A copy that raises or answers with a
+    status other than 200 counts as failed and the other copy is awaited;
+    the failure is raised (or its response returned) only when both failed.
+    on_discard(response) receives the losing copy's successful response
+    whenever it arrives, so the tokens it used can still be accounted for.
+    """
+    tracker = get_tracker()
+    timeout = tracker.timeout_for(model, default_timeout, phase)
+    hedge_after = tracker.hedge_delay(model, phase) if hedge else None
+    if hedge_after is None:
+        return send(timeout)
+
+    started = threading.Event()
+
+    def send_primary(timeout):
+        started.set()
+        return send(timeout)
+
+    primary = _hedge_executor.submit(send_primary, timeout)
+    # Time spent queued behind other hedged calls does not count towards hedge_after
+    started.wait()
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    if on_hedge:
+        on_hedge()
+    duplicate = _hedge_executor.submit(send, timeout)
+    pending = {primary, duplicate}
+    failed = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if not _failed(future):
+                tracker.record_hedge(model, won=future is duplicate, phase=phase)
+                if on_discard:
+                    # The losing copy finishes in the background (or already has)
+                    for loser in ({primary, duplicate} - {future}):
+                        loser.add_done_callback(partial(_discard, on_discard))
+                return future.result()
+            # Prefer a failed response (its status and headers) over an exception
+            if failed is None or failed.exception() is not None:
+                failed = future
+    tracker.record_hedge(model, won=False, phase=phase)
+    return failed.result()
+
+
+def is_timeout(error: Exception) -> bool:
+    """Whether an exception from requests/httpx/openai was a timeout."""
+    return 'timeout' in type(error).__name__.lower() or 'timed out' in str(error).lower()
+
+
+def print_tail_report(report: dict = None):
+    """Print per-model tail latency and what the slowest 5% of calls cost."""
+    report = report if report is not None else get_tracker().tail_report()
+    if not report:
+        return
+    print(f"\n🐢 Tail latency per model and phase:")
+    print(f"   {'model':<34} {'phase':<12} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>6} {'tail cost':>10} {'timeouts':>9} {'hedges':>7}")
+    total_excess = 0.0
+    total_time = 0.0
+    for (model, phase), r in sorted(report.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        total_excess += r['tail_excess']
+        total_time += r['total']
+        print(f"   {model:<34} {phase or '-':<12} {r['p50']:>5.1f}s {r['p95']:>5.1f}s {r['p99']:>5.1f}s {r['max']:>5.1f}s "
+              f"{r['tail_excess']:>9.1f}s {r['timeouts']:>9} {r['hedge_wins']:>3}/{r['hedges']:<3}")
+    share = total_excess / total_time * 100 if total_time > 0 else 0.0
+    print(f"   Calls beyond p95 cost {total_excess:.1f}s over their p95 ({share:.1f}% of call time)")
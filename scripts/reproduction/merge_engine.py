@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Single-pass indexed merge of Batch API judge outputs.
+Any number of batch output files are read once. Each line's custom_id is
+pulled from the raw bytes and decoded, and the (phase, model, question,
+dimension) it scores is indexed to the record's file offset; the record
+itself is not parsed. Judge JSON is parsed only while the merged score
+files are written, one model at a time, so memory holds the index and a
+single model's scores instead of every evaluation, however many models or
+dimensions a run has.
+"""
+
+import json
+import re
+from collections import Counter
+
+from custom_id_codec import decode_custom_id
+
+CUSTOM_ID = re.compile(rb'"custom_id":\s*"((?:[^"\\]|\\.)*)"')
+
+# Merged score files per phase; by_dimension nests each question's scores under their dimension
+MERGED_OUTPUTS = {
+    'phase1': {'path': 'results/phase1_all_models_eval_scores.json', 'by_dimension': True,
+               'dimensions': ['appropriateness', 'actionability']},
+    'falsereject': {'path': 'results/falsereject_all_models_eval_scores.json', 'by_dimension': False,
+                    'metadata': {'questions': 24}}
+}
+
+
+def judge_scores(line: bytes):
+    """Parsed judge JSON from one batch output record (None if it has none)."""
+    try:
+        record = json.loads(line)
+        content = record['response']['body']['choices'][0]['message']['content']
+        return json.loads(content)
+    except Exception as e:
+        print(f"  Error parsing evaluation: {e}")
+        return None
+
+
+def has_scores(line: bytes) -> bool:
+    """Whether a batch output record is a 200 response carrying parseable judge JSON."""
+    try:
+        response = json.loads(line)['response']
+        if response.get('status_code', 200) != 200:
+            return False
+        return bool(json.loads(response['body']['choices'][0]['message']['content']))
+    except Exception:
+        return False
+
+
+class MergeIndex:
+    """(phase, model, question, dimension) -> location of the judge record that scores it."""
+
+    def __init__(self):
+        self.paths = []
+        self.index = {}  # phase -> model -> question -> dimension -> (file number, offset)
+        self.evaluations = Counter()  # records per phase, as read
+        self.unrecognized = 0
+
+    def add_file(self, path, phase: str = None, dimension: str = None) -> dict:
+        """Index one batch output file, keeping records of phase/dimension (None = any).
+
+        A later record for the same key replaces the earlier one only if it
+        is a 200 response with judge scores, so a failed retry never hides
+        a valid score. Returns the file's record count and the records
+        indexed per model.
+        """
+        file_number = len(self.paths)
+        self.paths.append(str(path))
+        records = 0
+        models = Counter()
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                records += 1
+                match = CUSTOM_ID.search(line)
+                key = None
+                if match:
+                    raw = match.group(1)
+                    custom_id = json.loads(b'"' + raw + b'"') if b'\\' in raw else raw.decode('utf-8')
+                    key = decode_custom_id(custom_id)
+                if key is None:
+                    self.unrecognized += 1
+                    continue
+                if (phase and key['phase'] != phase) or (dimension and key['dimension'] != dimension):
+                    continue
+                questions = self.index.setdefault(key['phase'], {}).setdefault(key['model'], {})
+                dimensions = questions.setdefault(key['question'], {})
+                # Duplicates are rare, so only they pay for parsing the record
+                if key['dimension'] in dimensions and not has_scores(line):
+                    continue
+                dimensions[key['dimension']] = (file_number, line_offset)
+                models[key['model']] += 1
+        if phase:
+            self.evaluations[phase] += records
+        return {'records': records, 'models': models}
+
+    def models(self, phase: str) -> dict:
+        """model -> number of questions indexed for phase."""
+        return {model: len(questions) for model, questions in self.index.get(phase, {}).items()}
+
+    def dimensions(self, phase: str, order: list = None) -> list:
+        """Dimensions indexed for phase: those in order first (as listed), then the rest sorted."""
+        seen = set()
+        for questions in self.index.get(phase, {}).values():
+            for dimensions in questions.values():
+                seen.update(dimensions)
+        order = [dimension for dimension in order or [] if dimension in seen]
+        return order + sorted(seen.difference(order))
+
+    def iter_model_scores(self, phase: str, by_dimension: bool = True):
+        """Yield (model, scores) for phase, parsing one model's judge records at a time."""
+        handles = {}
+        try:
+            for model, questions in self.index.get(phase, {}).items():
+                scores = {}
+                for question, dimensions in questions.items():
+                    for dimension, (file_number, offset) in dimensions.items():
+                        if file_number not in handles:
+                            handles[file_number] = open(self.paths[file_number], 'rb')
+                        handle = handles[file_number]
+                        handle.seek(offset)
+                        parsed = judge_scores(handle.readline())
+                        if not parsed:
+                            continue
+                        if by_dimension:
+                            scores.setdefault(question, {})[dimension] = parsed
+                        else:
+                            scores[question] = parsed
+                yield model, scores
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+
+def _indent(text: str, spaces: int) -> str:
+    return text.replace('\n', '\n' + ' ' * spaces)
+
+
+def write_scores(index: MergeIndex, phase: str, path: str, by_dimension: bool = True,
+                 metadata: dict = None, on_model=None, dimensions: list = None):
+    """Stream phase's merged scores to path in the same layout as json.dump(..., indent=2).
+
+    on_model(model, scores) sees each model's scores as they are written;
+    dimensions orders the metadata's dimension list (see MergeIndex.dimensions).
+    """
+    meta = {'total_models': len(index.index.get(phase, {})), 'total_evaluations': index.evaluations[phase]}
+    if by_dimension:
+        meta['dimensions'] = index.dimensions(phase, dimensions)
+    meta.update(metadata or {})
+
+    with open(path, 'w') as f:
+        f.write('{\n  "metadata": ' + _indent(json.dumps(meta, indent=2), 2) + ',\n  "scores_by_model": {')
+        first = True
+        for model, scores in index.iter_model_scores(phase, by_dimension):
+            if on_model:
+                on_model(model, scores)
+            f.write(('' if first else ',') + '\n    ' + json.dumps(model) + ': '
+                    + _indent(json.dumps(scores, indent=2), 4))
+            first = False
+        f.write('}\n}' if first else '\n  }\n}')
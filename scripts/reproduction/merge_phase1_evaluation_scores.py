@@ -7,37 +7,36 @@ import json
 from pathlib import Path
 from typing import Dict
 
+from custom_id_codec import decode_custom_id
+
 BASE_DIR = Path(__file__).parent.parent
 
-def load_batch_scores(batch_file: Path, dimension: str) -> Dict[str, float]:
+def load_batch_scores(batch_file: Path, dimension: str) -> Dict[tuple, float]:
     """
     Load scores from a batch output file
 
-    Returns dict mapping: {model___task_id: score}
+    Returns dict mapping: {(model, question_id): score}
     """
     scores = {}
 
     with open(batch_file, 'r') as f:
         for line in f:
             result = json.loads(line)
+            key = decode_custom_id(result['custom_id'])
+            if key is None or key['dimension'] != dimension:
+                continue
+            # A failed Batch API request has "response": null next to an error object
+            response = result.get('response') or {}
+            if response.get('status_code') != 200:
+                if not response:
+                    print(f"Warning: Request {result['custom_id']} failed: {result.get('error')}")
+                continue
 
             try:
-                if result['response']['status_code'] == 200:
-                    custom_id = result['custom_id']
-                    content = result['response']['body']['choices'][0]['message']['content']
-                    eval_data = json.loads(content)
-                    score = eval_data['score']
-
-                    # Parse custom_id: model___task_id___dimension
-                    parts = custom_id.split('___')
-                    if len(parts) >= 2:
-                        model = parts[0]
-                        task_id = parts[1]
-                        key = f"{model}___{task_id}"
-                        scores[key] = score
-            except Exception as e:
-                print(f"Warning: Failed to parse result {result.get('custom_id', 'unknown')}: {e}")
-                continue
+                content = response['body']['choices'][0]['message']['content']
+                scores[(key['model'], key['question'])] = json.loads(content)['score']
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Warning: Failed to parse result {result['custom_id']}: {e}")
 
     return scores
 
@@ -97,7 +96,7 @@ def main():
             if 'abliterated' not in model:
                 continue
 
-            key = f"{model}___{question_id}"
+            key = (model, str(question_id))
 
             # Add scores if available
             if key in actionability_scores and key in appropriateness_scores:
@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from typing import Dict
 
+from custom_id_codec import decode_custom_id
+
 BASE_DIR = Path(__file__).parent.parent
 
 def load_batch_scores(batch_file: Path) -> Dict[str, float]:
@@ -94,7 +96,8 @@ def main():
             # The custom_id in batch might be model___None or model___description
             score_data = None
             for custom_id, data in all_scores[model].items():
-                if custom_id.startswith(f"{model}___"):
+                key = decode_custom_id(custom_id)
+                if key and key['model'] == model:
                     # Match by position (batch results are in order)
                     score_data = data
                     break
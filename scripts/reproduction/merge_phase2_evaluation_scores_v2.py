@@ -7,32 +7,37 @@ Version 2: Uses task_id matching from custom_id
 import json
 from pathlib import Path
 
+from custom_id_codec import decode_custom_id
+
 BASE_DIR = Path(__file__).parent.parent
 
 def load_batch_scores_by_task_id(batch_file: Path, model: str):
-    """Load scores indexed by task_id extracted from custom_id"""
+    """Load scores indexed by the task_id decoded from custom_id"""
     scores = {}
 
     with open(batch_file, 'r') as f:
         for line in f:
             result = json.loads(line)
+            key = decode_custom_id(result['custom_id'])
+            if key is None or key['model'] != model:
+                continue
+            # A failed Batch API request has "response": null next to an error object
+            response = result.get('response') or {}
+            if response.get('status_code') != 200:
+                if not response:
+                    print(f"Warning: Request {result['custom_id']} failed: {result.get('error')}")
+                continue
 
             try:
-                if result['response']['status_code'] == 200:
-                    custom_id = result['custom_id']
-                    content = result['response']['body']['choices'][0]['message']['content']
-                    eval_data = json.loads(content)
-
-                    # Extract task_id from custom_id: "model___task_id"
-                    parts = custom_id.split('___')
-                    if len(parts) >= 2:
-                        task_id = parts[1]  # e.g., "contract_001_add_clause_1" or "None"
-                        scores[task_id] = {
-                            'score': eval_data['score'],
-                            'justification': eval_data.get('justification', '')
-                        }
-            except Exception as e:
-                print(f"Warning: Failed to parse {result.get('custom_id', 'unknown')}: {e}")
+                content = response['body']['choices'][0]['message']['content']
+                eval_data = json.loads(content)
+                # e.g., "contract_001_add_clause_1" or "None"
+                scores[key['question']] = {
+                    'score': eval_data['score'],
+                    'justification': eval_data.get('justification', '')
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Warning: Failed to parse {result['custom_id']}: {e}")
 
     return scores
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Compiled multi-pattern phrase matcher for refusal detection and keyword
+analysis. All pattern sets are compiled once into a single trie-shaped regex
+(shared prefixes factored out) that the C regex engine scans; overlapping
+phrases (e.g. 'specific' inside 'lacks specific') are all reported.
+
+Run directly to measure batch throughput on results/phase3_responses.json.
+"""
+
+import json
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Curly quotes and non-breaking spaces folded to ASCII before lowercasing
+FOLD_CHARS = {
+    '\u2018': "'", '\u2019': "'", '\u201b': "'", '\u2032': "'",
+    '\u201c': '"', '\u201d': '"', '\u201f': '"', '\u2033': '"',
+    '\u00a0': ' ', '\u202f': ' '
+}
+# One regex pass is far faster than str.translate with a non-ASCII table
+FOLD_REGEX = re.compile('[' + ''.join(FOLD_CHARS) + ']')
+
+
+def trie_pattern(phrases) -> str:
+    """Regex source matching any phrase, factored as a trie (longest match wins)."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        ends_here = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if ends_here else group
+
+    return build(trie)
+
+
+def normalize(text: str) -> str:
+    """Quote/space folding and lowercasing; offsets match the input for ASCII text."""
+    if not text.isascii():
+        text = FOLD_REGEX.sub(lambda match: FOLD_CHARS[match.group()], text)
+    return text.lower()
+
+
+class PatternMatcher:
+    """Match many labelled phrase sets against text in a single pass."""
+
+    def __init__(self, pattern_sets: dict):
+        # label -> list of phrases; phrases are matched case-insensitively
+        self.patterns = []
+        for label, phrases in pattern_sets.items():
+            for phrase in phrases:
+                self.patterns.append((label, normalize(phrase)))
+
+        # phrase -> every (index, label, phrase) that matches whenever it does:
+        # itself (under any label) plus all shorter phrases that are its prefix
+        entries = defaultdict(list)
+        for index, (label, phrase) in enumerate(self.patterns):
+            entries[phrase].append((index, label, phrase))
+        self.implied = {
+            phrase: [entry for other, other_entries in entries.items()
+                     if phrase.startswith(other) for entry in other_entries]
+            for phrase in entries
+        }
+
+        # The greedy trie reports the longest phrase starting at each position;
+        # shorter phrases sharing that start come from self.implied
+        self.regex = re.compile(trie_pattern(entries)) if entries else None
+
+    def finditer(self, text: str, normalized: bool = False):
+        """Yield (offset, label, phrase, pattern_index) for every match, by offset.
+
+        Pass normalized=True when text already went through normalize().
+        """
+        if self.regex is None or not text:
+            return
+        if not normalized:
+            text = normalize(text)
+        search = self.regex.search
+        match = search(text)
+        while match:
+            position = match.start()
+            for index, label, phrase in self.implied[match.group()]:
+                yield position, label, phrase, index
+            # Restart one character later so overlapping phrases are found too
+            match = search(text, position + 1)
+
+    def matches(self, text: str, normalized: bool = False) -> list:
+        """All matches as dicts with offset, label and pattern."""
+        return [
+            {'offset': offset, 'label': label, 'pattern': phrase}
+            for offset, label, phrase, _ in self.finditer(text, normalized)
+        ]
+
+    def first_by_priority(self, text: str, normalized: bool = False):
+        """The matching phrase listed earliest in pattern_sets (like a linear `in` scan)."""
+        best = None
+        for _, label, phrase, index in self.finditer(text, normalized):
+            if best is None or index < best[0]:
+                best = (index, label, phrase)
+        return None if best is None else best[1:]
+
+    def present(self, text: str, normalized: bool = False) -> set:
+        """Distinct (label, phrase) pairs that occur at least once."""
+        return {(label, phrase) for _, label, phrase, _ in self.finditer(text, normalized)}
+
+    def labels_present(self, text: str, normalized: bool = False) -> set:
+        """Distinct labels with at least one matching phrase."""
+        return {label for _, label, _, _ in self.finditer(text, normalized)}
+
+    def scan_batch(self, texts) -> list:
+        """matches() for many texts."""
+        return [self.matches(text) for text in texts]
+
+
+def _throughput(scan, texts: list, rounds: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            scan(text)
+    return len(texts) * rounds / (time.perf_counter() - start_time)
+
+
+def main():
+    from deep_dive_evaluation_analysis import NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS
+    from run_all_abliterated_benchmarks import REFUSAL_PATTERNS
+
+    responses_file = Path('results/phase3_responses.json')
+    with open(responses_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    texts = [
+        result.get('response') or ''
+        for question in data['questions']
+        for result in question['model_responses'].values()
+    ]
+    rounds = 20
+
+    print(f"📊 {len(texts)} responses × {rounds} rounds")
+
+    refusal_matcher = PatternMatcher({'refusal': REFUSAL_PATTERNS})
+
+    def linear_refusal(text):
+        lowered = text.replace('\u2019', "'").replace('\u2018', "'").lower()
+        for pattern in REFUSAL_PATTERNS:
+            if pattern in lowered:
+                return pattern
+
+    print(f"\nRefusal patterns ({len(REFUSAL_PATTERNS)} phrases, first match):")
+    print(f"   Compiled matcher: {_throughput(refusal_matcher.first_by_priority, texts, rounds):,.0f} responses/sec")
+    print(f"   Linear `in` scan: {_throughput(linear_refusal, texts, rounds):,.0f} responses/sec")
+
+    keywords = POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS
+    theme_matcher = PatternMatcher({'positive': POSITIVE_KEYWORDS, 'negative': NEGATIVE_KEYWORDS})
+
+    def linear_themes(text):
+        lowered = text.lower()
+        return [keyword for keyword in keywords if keyword in lowered]
+
+    print(f"\nTheme keywords ({len(keywords)} phrases, every match):")
+    print(f"   Compiled matcher: {_throughput(theme_matcher.present, texts, rounds):,.0f} responses/sec")
+    print(f"   Linear `in` scan: {_throughput(linear_themes, texts, rounds):,.0f} responses/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,16 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from batch_builder import print_manifest, write_batch_file
+from custom_id_codec import encode_custom_id
+from token_estimator import TruncationReport, print_truncation_report
+
 BASE_DIR = Path(__file__).parent.parent
 
+# Token budgets for the text placed in the judge prompt
+CONTRACT_TOKEN_BUDGET = 750
+RESPONSE_TOKEN_BUDGET = 1000
+
 # Evaluation prompt for GPT-4o judge
 JUDGE_PROMPT = """You are an expert legal evaluator. Evaluate the following response to a legal task.
 
@@ -49,18 +57,19 @@ def load_phase2_tasks():
     with open(file_path, 'r') as f:
         return json.load(f)
 
-def create_batch_request(custom_id, task_data, model_name, response_text):
+def create_batch_request(custom_id, task_data, model_name, response_text, truncation):
     """Create a single batch API request"""
 
     # Get task info
     task_instruction = task_data.get('instruction', '')
-    contract_text = task_data.get('contract_text', '')[:3000]  # Limit context length
+    contract_text = truncation.fit(custom_id, 'contract_text',
+                                   task_data.get('contract_text', ''), CONTRACT_TOKEN_BUDGET)
 
     # Create evaluation prompt
     prompt = JUDGE_PROMPT.format(
         task_instruction=task_instruction,
         contract_text=contract_text,
-        model_response=response_text[:4000]  # Limit response length
+        model_response=truncation.fit(custom_id, 'response', response_text, RESPONSE_TOKEN_BUDGET)
     )
 
     return {
@@ -107,6 +116,7 @@ def main():
         print(f"\n🤖 Processing {model_name}...")
 
         batch_requests = []
+        truncation = TruncationReport()
         skipped = 0
 
         for question in abliterated_data['questions']:
@@ -132,12 +142,13 @@ def main():
                 continue
 
             # Create batch request
-            custom_id = f"{model_name}___{task_id}"
+            custom_id = encode_custom_id("phase2", "quality", task_id, model_name)
             request = create_batch_request(
                 custom_id=custom_id,
                 task_data=task_data,
                 model_name=model_name,
-                response_text=response_data['response']
+                response_text=response_data['response'],
+                truncation=truncation
             )
             batch_requests.append(request)
 
@@ -148,13 +159,12 @@ def main():
         # Save JSONL file
         model_safe_name = model_name.replace(':', '_').replace('/', '_')
         output_file = BASE_DIR / "results" / f"batch_eval_{model_safe_name}.jsonl"
+        print_manifest(write_batch_file(output_file, batch_requests))
 
-        with open(output_file, 'w') as f:
-            for request in batch_requests:
-                f.write(json.dumps(request) + '\n')
-
-        print(f"   ✅ Saved: {output_file}")
-        print(f"   File size: {output_file.stat().st_size / 1024:.1f} KB")
+        print_truncation_report(truncation)
+        truncation_file = BASE_DIR / "results" / f"batch_eval_truncation_{model_safe_name}.json"
+        truncation.save(truncation_file)
+        print(f"   Per-item report: {truncation_file.name}")
 
     print("\n" + "=" * 80)
     print("NEXT STEPS - SUBMIT TO OPENAI BATCH API")
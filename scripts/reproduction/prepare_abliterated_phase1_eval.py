@@ -7,8 +7,16 @@ Evaluates on ACTIONABILITY and APPROPRIATENESS (same as original 10 models)
 import json
 from pathlib import Path
 
+from batch_builder import print_manifest, write_batch_file
+from custom_id_codec import encode_custom_id
+from token_estimator import TruncationReport, print_truncation_report
+
 BASE_DIR = Path(__file__).parent.parent
 
+# Token budgets for the text placed in each judge prompt
+QUESTION_TOKEN_BUDGET = 250
+RESPONSE_TOKEN_BUDGET = 1000
+
 # Evaluation prompts
 ACTIONABILITY_PROMPT = """Evaluate the following legal response for ACTIONABILITY.
 
@@ -54,11 +62,14 @@ def load_abliterated_phase1():
     with open(file_path, 'r') as f:
         return json.load(f)
 
-def create_batch_request(custom_id, question, response, eval_type):
+def create_batch_request(custom_id, question, response, eval_type, truncation):
     """Create a single batch API request"""
 
     prompt = ACTIONABILITY_PROMPT if eval_type == "actionability" else APPROPRIATENESS_PROMPT
-    prompt = prompt.format(question=question[:1000], response=response[:4000])
+    prompt = prompt.format(
+        question=truncation.fit(custom_id, 'question', question, QUESTION_TOKEN_BUDGET),
+        response=truncation.fit(custom_id, 'response', response, RESPONSE_TOKEN_BUDGET)
+    )
 
     return {
         "custom_id": custom_id,
@@ -94,6 +105,7 @@ def main():
 
         actionability_requests = []
         appropriateness_requests = []
+        truncation = TruncationReport()
         skipped = 0
 
         for question in abliterated_data['questions']:
@@ -116,18 +128,20 @@ def main():
 
             # Create actionability request
             actionability_requests.append(create_batch_request(
-                custom_id=f"{model_name}___{q_id}___actionability",
+                custom_id=encode_custom_id("phase1", "actionability", q_id, model_name),
                 question=q_text,
                 response=response_text,
-                eval_type="actionability"
+                eval_type="actionability",
+                truncation=truncation
             ))
 
             # Create appropriateness request
             appropriateness_requests.append(create_batch_request(
-                custom_id=f"{model_name}___{q_id}___appropriateness",
+                custom_id=encode_custom_id("phase1", "appropriateness", q_id, model_name),
                 question=q_text,
                 response=response_text,
-                eval_type="appropriateness"
+                eval_type="appropriateness",
+                truncation=truncation
             ))
 
         print(f"   Created {len(actionability_requests)} actionability evaluations")
@@ -140,17 +154,16 @@ def main():
 
         # Actionability file
         action_file = BASE_DIR / "results" / f"batch_eval_phase1_actionability_{model_safe_name}.jsonl"
-        with open(action_file, 'w') as f:
-            for request in actionability_requests:
-                f.write(json.dumps(request) + '\n')
-        print(f"   ✅ Saved: {action_file.name} ({action_file.stat().st_size / 1024:.1f} KB)")
+        print_manifest(write_batch_file(action_file, actionability_requests))
 
         # Appropriateness file
         approp_file = BASE_DIR / "results" / f"batch_eval_phase1_appropriateness_{model_safe_name}.jsonl"
-        with open(approp_file, 'w') as f:
-            for request in appropriateness_requests:
-                f.write(json.dumps(request) + '\n')
-        print(f"   ✅ Saved: {approp_file.name} ({approp_file.stat().st_size / 1024:.1f} KB)")
+        print_manifest(write_batch_file(approp_file, appropriateness_requests))
+
+        print_truncation_report(truncation)
+        truncation_file = BASE_DIR / "results" / f"batch_eval_phase1_truncation_{model_safe_name}.json"
+        truncation.save(truncation_file)
+        print(f"   Per-item report: {truncation_file.name}")
 
     print("\n" + "=" * 80)
     print("SUMMARY")
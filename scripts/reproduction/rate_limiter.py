@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-provider token-bucket rate limiting for the benchmark runners.
+Each endpoint gets a requests/min and a tokens/min bucket. A 429 response
+pauses the endpoint for its Retry-After and lowers the request rate, which
+then creeps back up while calls succeed.
+"""
+
+import os
+import threading
+import time
+
+# Default ceilings per endpoint (override with e.g. OPENROUTER_RPM / OPENROUTER_TPM)
+DEFAULT_LIMITS = {
+    'openrouter': {'rpm': 200, 'tpm': 400000},
+    'openai': {'rpm': 500, 'tpm': 800000},
+    'openwebui': {'rpm': 30, 'tpm': 120000}
+}
+
+# Multiplicative decrease on 429, additive increase per successful call
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.02
+MIN_RATE_FRACTION = 0.1
+
+# Cooldown used when a 429 carries no Retry-After header
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_min."""
+
+    def __init__(self, rate_per_min: float):
+        self.capacity = float(rate_per_min)
+        self.rate_per_min = float(rate_per_min)
+        self.tokens = float(rate_per_min)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_min / 60.0)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until amount tokens are available; return seconds waited."""
+        # A single oversized request may take at most a full bucket
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) * 60.0 / self.rate_per_min
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the fact."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def set_rate(self, rate_per_min: float):
+        with self.lock:
+            self._refill()
+            self.rate_per_min = rate_per_min
+
+
+class EndpointLimiter:
+    """Requests/min and tokens/min buckets for one provider endpoint."""
+
+    def __init__(self, name: str, rpm: float, tpm: float):
+        self.name = name
+        self.max_rpm = rpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """Wait for capacity to send one request; return seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                pause = self.cooldown_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+            waited += pause
+
+        waited += self.requests.acquire(1)
+        if estimated_tokens:
+            waited += self.tokens.acquire(estimated_tokens)
+        return waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Reconcile the tokens/min bucket with the usage the API reported."""
+        if actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def record_success(self):
+        """Creep the request rate back towards its configured ceiling."""
+        rate = self.requests.rate_per_min
+        if rate < self.max_rpm:
+            self.requests.set_rate(min(self.max_rpm, rate + self.max_rpm * RECOVERY_STEP))
+
+    def record_rate_limit(self, retry_after=None) -> float:
+        """Pause the endpoint after a 429 and halve its request rate."""
+        delay = parse_retry_after(retry_after)
+        with self.lock:
+            self.rate_limited += 1
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+        self.requests.set_rate(max(self.max_rpm * MIN_RATE_FRACTION,
+                                   self.requests.rate_per_min * BACKOFF_FACTOR))
+        return delay
+
+
+def parse_retry_after(value) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds only)."""
+    if value is None:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def estimate_tokens(text: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 chars/token) for the prompt plus expected completion."""
+    return len(text or '') // 4 + max_tokens // 4
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(endpoint: str) -> EndpointLimiter:
+    """Return the process-wide limiter for an endpoint ('openrouter', 'openai', 'openwebui')."""
+    with _limiters_lock:
+        if endpoint not in _limiters:
+            defaults = DEFAULT_LIMITS.get(endpoint, {'rpm': 60, 'tpm': 100000})
+            prefix = endpoint.upper()
+            rpm = float(os.getenv(f"{prefix}_RPM", defaults['rpm']))
+            tpm = float(os.getenv(f"{prefix}_TPM", defaults['tpm']))
+            _limiters[endpoint] = EndpointLimiter(endpoint, rpm, tpm)
+        return _limiters[endpoint]
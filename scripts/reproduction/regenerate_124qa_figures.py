@@ -15,7 +15,6 @@ Generates:
 - figure5_model_rankings.png (NEW - overall rankings for 124 Q&A)
 """
 
-import json
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -23,6 +22,9 @@ import seaborn as sns
 from pathlib import Path
 from scipy import stats
 import warnings
+
+from figure_data import load_judge_outputs, load_json
+
 warnings.filterwarnings('ignore')
 
 # Set publication-quality plotting style
@@ -72,12 +74,10 @@ class QA124FigureGenerator:
         print("📂 Loading 124 Q&A questions data...")
 
         # Load Phase 1
-        with open('results/phase1_final.json', 'r') as f:
-            phase1 = json.load(f)
+        phase1 = load_json('results/phase1_final.json')
 
         # Load FalseReject
-        with open('results/falsereject_benchmark_final.json', 'r') as f:
-            falsereject = json.load(f)
+        falsereject = load_json('results/falsereject_benchmark_final.json')
 
         # Combine questions with source tracking
         all_questions = []
@@ -113,16 +113,9 @@ class QA124FigureGenerator:
 
         # Parse appropriateness
         self.appropriateness_scores = {}
-        with open(eval_dir / 'appropriateness_results.jsonl', 'r') as f:
-            for line in f:
-                result = json.loads(line)
-                custom_id = result['custom_id']
-                try:
-                    response_text = result['response']['body']['choices'][0]['message']['content']
-                    score_data = json.loads(response_text)
-                    self.appropriateness_scores[custom_id] = score_data
-                except:
-                    pass
+        for custom_id, score_data in load_judge_outputs(eval_dir / 'appropriateness_results.jsonl'):
+            if score_data is not None:
+                self.appropriateness_scores[custom_id] = score_data
 
         print(f"   ✅ Loaded {len(self.appropriateness_scores)} appropriateness scores")
 
@@ -4,7 +4,6 @@ Regenerate ALL figures for the legal LLM benchmark paper
 Based on latest data including abliterated models
 """
 
-import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
@@ -12,6 +11,9 @@ from pathlib import Path
 from collections import defaultdict
 import seaborn as sns
 
+from figure_data import load_json
+from figure_pool import render_figures
+
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -25,18 +27,15 @@ FIGURES_DIR.mkdir(parents=True, exist_ok=True)
 
 def load_falsereject_data():
     """Load FalseReject analysis with abliterated models"""
-    with open(RESULTS_DIR / "falsereject_analysis_with_abliterated.json", 'r') as f:
-        return json.load(f)
+    return load_json(RESULTS_DIR / "falsereject_analysis_with_abliterated.json")
 
 def load_phase1_data():
     """Load Phase 1 data with evaluation scores"""
-    with open(RESULTS_DIR / "phase1_final_with_abliterated_scored.json", 'r') as f:
-        return json.load(f)
+    return load_json(RESULTS_DIR / "phase1_final_with_abliterated_scored.json")
 
 def load_phase2_data():
     """Load Phase 2 data with evaluation scores"""
-    with open(RESULTS_DIR / "phase2_final_with_abliterated_scored.json", 'r') as f:
-        return json.load(f)
+    return load_json(RESULTS_DIR / "phase2_final_with_abliterated_scored.json")
 
 #==============================================================================
 # FIGURE 1: FalseReject Refusal Rates (Horizontal Bar Chart)
@@ -640,6 +639,24 @@ def generate_figure8_utility_quality_tradeoff():
 # MAIN EXECUTION
 #==============================================================================
 
+FIGURES = [
+    'generate_figure1_falsereject_rates',
+    'generate_figure2_tiered_rejection',
+    'generate_figure3_phase1_quality',
+    'generate_figure4_theme_distribution',
+    'generate_figure5_failure_patterns',
+    'generate_figure6_task_variance',
+    'generate_figure7_success_factors',
+    'generate_figure8_utility_quality_tradeoff'
+]
+
+# Files the figures read, parsed once before the workers start
+DATA_SOURCES = [
+    RESULTS_DIR / "falsereject_analysis_with_abliterated.json",
+    RESULTS_DIR / "phase1_final_with_abliterated_scored.json",
+    RESULTS_DIR / "phase2_final_with_abliterated_scored.json"
+]
+
 def main():
     print("=" * 80)
     print("🎨 REGENERATING ALL FIGURES FOR LEGAL LLM BENCHMARK PAPER")
@@ -650,40 +667,30 @@ def main():
     print(f"  • Phase 1: {RESULTS_DIR / 'phase1_final_with_abliterated_scored.json'}")
     print(f"  • Phase 2: {RESULTS_DIR / 'phase2_final_with_abliterated_scored.json'}")
 
-    # Generate all figures
-    try:
-        generate_figure1_falsereject_rates()
-        generate_figure2_tiered_rejection()
-        generate_figure3_phase1_quality()
-        generate_figure4_theme_distribution()
-        generate_figure5_failure_patterns()
-        generate_figure6_task_variance()
-        generate_figure7_success_factors()
-        generate_figure8_utility_quality_tradeoff()
-
-        print("\n" + "=" * 80)
-        print("✅ ALL FIGURES GENERATED SUCCESSFULLY!")
-        print("=" * 80)
-        print(f"\nTotal figures created: 8")
-        print(f"Location: {FIGURES_DIR}")
-        print("\nFigures:")
-        print("  1. figure1_falsereject_refusal_rates.png/pdf")
-        print("  2. figure2_tiered_rejection_rates.png/pdf")
-        print("  3. figure3_phase1_quality_scores.png/pdf")
-        print("  4. figure4_evaluation_themes.png/pdf (NEW!)")
-        print("  5. figure5_failure_patterns.png/pdf (NEW!)")
-        print("  6. figure6_task_variance.png/pdf (NEW!)")
-        print("  7. figure7_success_factors.png/pdf (NEW!)")
-        print("  8. figure8_utility_quality_tradeoff.png/pdf")
-        print("\n✨ Ready for paper submission!")
-        print("=" * 80)
-
-    except Exception as e:
-        print(f"\n❌ Error generating figures: {e}")
-        import traceback
-        traceback.print_exc()
+    # Generate all figures across a process pool (FIGURE_WORKERS)
+    results = render_figures(Path(__file__).stem, FIGURES, data_sources=DATA_SOURCES)
+    failed = [result['figure'] for result in results if result['error']]
+    if failed:
+        print(f"\n❌ Error generating figures: {', '.join(failed)}")
         return 1
 
+    print("\n" + "=" * 80)
+    print("✅ ALL FIGURES GENERATED SUCCESSFULLY!")
+    print("=" * 80)
+    print(f"\nTotal figures created: 8")
+    print(f"Location: {FIGURES_DIR}")
+    print("\nFigures:")
+    print("  1. figure1_falsereject_refusal_rates.png/pdf")
+    print("  2. figure2_tiered_rejection_rates.png/pdf")
+    print("  3. figure3_phase1_quality_scores.png/pdf")
+    print("  4. figure4_evaluation_themes.png/pdf (NEW!)")
+    print("  5. figure5_failure_patterns.png/pdf (NEW!)")
+    print("  6. figure6_task_variance.png/pdf (NEW!)")
+    print("  7. figure7_success_factors.png/pdf (NEW!)")
+    print("  8. figure8_utility_quality_tradeoff.png/pdf")
+    print("\n✨ Ready for paper submission!")
+    print("=" * 80)
+
     return 0
 
 if __name__ == "__main__":
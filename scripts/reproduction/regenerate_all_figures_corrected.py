@@ -4,13 +4,14 @@ Regenerate ALL figures with corrected FalseReject data
 Outputs to both figures/ and reports/paper/overleaf/figures/
 """
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 from pathlib import Path
 from collections import defaultdict
 
+from figure_data import load_json
+
 # CORRECTED model scores (after FalseReject Unicode bug fix)
 CORRECTED_SCORES = {
     "deepseek-chat-v3-0324": 8.93,
@@ -30,8 +31,7 @@ def load_corrected_falsereject_data():
     analysis_file = Path('results/falsereject_analysis.json')
 
     if analysis_file.exists():
-        with open(analysis_file, 'r') as f:
-            data = json.load(f)
+        data = load_json(analysis_file)
 
         refusal_rates = {}
         for model, stats in data['model_analysis'].items():
@@ -4,11 +4,12 @@ Regenerate FalseReject figures with all 12 models (10 standard + 2 abliterated)
 This shows the dramatic 0% refusal rate for abliterated models vs 37-100% for standard models
 """
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+from figure_data import load_json
+
 BASE_DIR = Path(__file__).parent.parent
 FIGURES_DIR = BASE_DIR / "reports" / "paper" / "overleaf" / "figures"
 
@@ -24,8 +25,7 @@ COLORS = {
 def load_data():
     """Load FalseReject analysis with abliterated models"""
     analysis_file = BASE_DIR / "results" / "falsereject_analysis_with_abliterated.json"
-    with open(analysis_file, 'r') as f:
-        return json.load(f)
+    return load_json(analysis_file)
 
 def clean_model_name(model_name):
     """Clean model name for display"""
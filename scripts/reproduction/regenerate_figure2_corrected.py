@@ -4,19 +4,19 @@ Regenerate Figure 2: Rejection Rates (FalseReject Benchmark)
 With CORRECTED refusal detection (Unicode apostrophe bug fixed)
 """
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+from figure_data import load_json
+
 def load_corrected_refusal_rates():
     """Load corrected refusal rates from analysis"""
 
     analysis_file = Path('results/falsereject_analysis.json')
 
     if analysis_file.exists():
-        with open(analysis_file, 'r') as f:
-            data = json.load(f)
+        data = load_json(analysis_file)
 
         # Extract refusal rates
         model_data = []
@@ -6,12 +6,13 @@ This figure shows histograms of score distributions for each model,
 highlighting bimodal patterns (peaks at 0 for refusals, 8-9 for responses).
 """
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 from collections import defaultdict
 
+from figure_data import load_json
+
 # CORRECTED model scores
 CORRECTED_SCORES = {
     "deepseek-chat-v3-0324": 8.93,
@@ -36,8 +37,7 @@ def load_score_distributions():
     # Get FalseReject refusal info
     falsereject_refusals = {}
     if falsereject_file.exists():
-        with open(falsereject_file, 'r') as f:
-            fr_data = json.load(f)
+        fr_data = load_json(falsereject_file)
         for model, stats in fr_data['model_analysis'].items():
             model_short = model.split('/')[-1]
             falsereject_refusals[model_short] = {
@@ -49,8 +49,7 @@ def load_score_distributions():
     model_scores = defaultdict(list)
 
     if phase1_file.exists():
-        with open(phase1_file, 'r') as f:
-            phase1 = json.load(f)
+        phase1 = load_json(phase1_file)
 
         # Extract scores from questions
         for q in phase1.get('questions', []):
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for model calls.
+Keyed by a hash of (endpoint, model, messages, temperature, max_tokens);
+only successful responses are stored. Least-recently-used entries are
+evicted once the cache grows past RESPONSE_CACHE_MAX_MB.
+
+RESPONSE_CACHE_MODE:
+- "on" (default): serve hits, call the API on misses and store the result
+- "replay": serve hits only; misses return an error without any API call
+- "off": bypass the cache entirely
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("RESPONSE_CACHE_DIR", "results/response_cache"))
+CACHE_MODE = os.getenv("RESPONSE_CACHE_MODE", "on")
+MAX_BYTES = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# Request fields that determine the response; anything else is ignored
+KEY_FIELDS = ('model', 'messages', 'temperature', 'max_tokens')
+
+
+def key_for(endpoint: str, payload: dict) -> str:
+    """Content hash of the request fields that determine the response."""
+    material = {'endpoint': endpoint}
+    material.update({field: payload.get(field) for field in KEY_FIELDS})
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """Sharded JSON-file cache with size-based LRU eviction."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, mode: str = CACHE_MODE, max_bytes: int = MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # path -> (size, last access) for LRU eviction
+        self.entries = {}
+        self.total_bytes = 0
+        if self.mode != 'off' and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*/*.json'):
+                stat = path.stat()
+                self.entries[path] = (stat.st_size, stat.st_mtime)
+                self.total_bytes += stat.st_size
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def lookup(self, key: str):
+        """Cached result, a replay-miss error result, or None (call the API)."""
+        if self.mode == 'off':
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self.lock:
+                self.misses += 1
+            if self.mode == 'replay':
+                return {'response': '', 'latency': 0, 'error': f"cache miss (replay only): {key[:12]}"}
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))
+        with self.lock:
+            self.hits += 1
+            if path in self.entries:
+                self.entries[path] = (self.entries[path][0], now)
+        return {**result, 'cached': True}
+
+    def store(self, key: str, result: dict):
+        """Store a successful result; failed calls are never cached and write errors are only logged."""
+        if self.mode != 'on' or result.get('error'):
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_name(path.name + f".{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # The response itself is fine; it just is not cached
+            print(f"⚠️  Could not cache response {key[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        size = path.stat().st_size
+        with self.lock:
+            previous = self.entries.get(path)
+            if previous:
+                self.total_bytes -= previous[0]
+            self.entries[path] = (size, time.time())
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used entries down to 90% of the cap
+        target = self.max_bytes * 0.9
+        for path, (size, _) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+            if self.total_bytes <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            del self.entries[path]
+            self.total_bytes -= size
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'mode': self.mode,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self.entries),
+                'size_mb': self.total_bytes / 1024 / 1024
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide cache shared by every caller."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def print_cache_stats():
+    stats = get_cache().stats()
+    if stats['mode'] == 'off':
+        return
+    print(f"🗄️  Response cache ({stats['mode']}): {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['entries']} entries ({stats['size_mb']:.1f} MB)")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Embedded SQLite results database for ad-hoc queries over every evaluated
+response. It holds the results_table.py rows in one `results` table,
+indexed on model, phase, question_id, category and score, and is rebuilt
+by the merge step (merge_all_models_evaluations.py).
+
+Query from the repository root; filters come from the environment:
+    RESULTS_PHASE=falsereject RESULTS_DIMENSION=appropriateness RESULTS_MODEL='openai/*' \\
+        RESULTS_MAX_SCORE=2 python scripts/reproduction/results_db.py
+    RESULTS_SQL="SELECT model, AVG(score) FROM results WHERE phase = 'phase2' GROUP BY model" \\
+        python scripts/reproduction/results_db.py
+The database is built on first use if it does not exist yet (RESULTS_REBUILD=1
+rebuilds it).
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from results_table import COLUMNS, build_rows
+
+RESULTS_DB = os.getenv("RESULTS_DB", "results/results.db")
+
+SQL_TYPES = {'string': 'TEXT', 'float64': 'REAL', 'bool': 'INTEGER', 'int64': 'INTEGER'}
+INDEXED_COLUMNS = ('model', 'phase', 'question_id', 'category', 'score')
+
+# Environment variable -> query_results() argument for the CLI
+QUERY_ENV = {
+    'RESULTS_PHASE': 'phase',
+    'RESULTS_MODEL': 'model',
+    'RESULTS_DIMENSION': 'dimension',
+    'RESULTS_CATEGORY': 'category',
+    'RESULTS_QUESTION': 'question_id',
+    'RESULTS_MIN_SCORE': 'min_score',
+    'RESULTS_MAX_SCORE': 'max_score',
+    'RESULTS_REFUSED': 'refused'
+}
+CLI_COLUMNS = ['phase', 'question_id', 'model', 'dimension', 'category', 'score', 'refused', 'latency_seconds']
+
+
+def write_results_db(rows: list = None, path=RESULTS_DB) -> int:
+    """(Re)build the database from results rows (build_rows() by default); returns the row count."""
+    rows = build_rows() if rows is None else rows
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Build beside the live file and swap it in, so readers never see a half-written database
+    partial = path.with_name(path.name + '.part')
+    partial.unlink(missing_ok=True)
+
+    names = [name for name, _ in COLUMNS]
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute(f"CREATE TABLE results ({', '.join(f'{name} {SQL_TYPES[kind]}' for name, kind in COLUMNS)})")
+        conn.executemany(f"INSERT INTO results VALUES ({', '.join('?' * len(names))})",
+                         ([row[name] for name in names] for row in rows))
+        for column in INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX idx_results_{column} ON results ({column})")
+        conn.execute("CREATE INDEX idx_results_phase_model ON results (phase, model)")
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    partial.replace(path)
+    print(f"   ✅ Saved: {path} ({len(rows)} rows)")
+    return len(rows)
+
+
+def connect(path=RESULTS_DB) -> sqlite3.Connection:
+    """Read connection to the database, building it first if it is missing."""
+    if not Path(path).exists():
+        write_results_db(path=path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def query(sql: str, params=(), path=RESULTS_DB) -> list:
+    """Rows of any SQL statement against the database, as dicts."""
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def query_results(phase: str = None, model: str = None, dimension: str = None, category: str = None,
+                  question_id: str = None, min_score: float = None, max_score: float = None,
+                  refused: bool = None, columns: list = None, path=RESULTS_DB) -> list:
+    """Result rows matching every given filter, as dicts.
+
+    model may be a glob ('openai/*'); scores are compared inclusively.
+    """
+    clauses = []
+    params = []
+    for column, value in (('phase', phase), ('dimension', dimension), ('category', category),
+                          ('question_id', question_id)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(str(value))
+    if model is not None:
+        clauses.append("model GLOB ?" if any(c in model for c in '*?[') else "model = ?")
+        params.append(model)
+    if min_score is not None:
+        clauses.append("score >= ?")
+        params.append(float(min_score))
+    if max_score is not None:
+        clauses.append("score <= ?")
+        params.append(float(max_score))
+    if refused is not None:
+        clauses.append("refused = ?")
+        params.append(int(refused))
+
+    names = {name for name, _ in COLUMNS}
+    selected = [column for column in (columns or [name for name, _ in COLUMNS]) if column in names]
+    sql = f"SELECT {', '.join(selected)} FROM results"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY phase, model, question_id, dimension"
+    return query(sql, params, path)
+
+
+def print_rows(rows: list, limit: int = 50):
+    if not rows:
+        print("No matching results")
+        return
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(_cell(row[column])) for row in rows[:limit])) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    print("  ".join("-" * widths[column] for column in columns))
+    for row in rows[:limit]:
+        print("  ".join(_cell(row[column]).ljust(widths[column]) for column in columns))
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more rows (RESULTS_LIMIT)")
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)[:60]
+
+
+def main():
+    if os.getenv("RESULTS_REBUILD", "0") == "1" or not Path(RESULTS_DB).exists():
+        write_results_db()
+
+    start_time = time.perf_counter()
+    sql = os.getenv("RESULTS_SQL")
+    if sql:
+        rows = query(sql)
+    else:
+        filters = {arg: os.environ[var] for var, arg in QUERY_ENV.items() if os.getenv(var)}
+        if 'refused' in filters:
+            filters['refused'] = filters['refused'].lower() in ('1', 'true', 'yes')
+        rows = query_results(columns=CLI_COLUMNS, **filters)
+    elapsed = time.perf_counter() - start_time
+
+    print_rows(rows, int(os.getenv("RESULTS_LIMIT", "50")))
+    print(f"\n📊 {len(rows)} rows in {elapsed * 1000:.1f} ms ({RESULTS_DB})")
+
+
+if __name__ == '__main__':
+    main()
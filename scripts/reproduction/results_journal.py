@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL journal for benchmark responses.
+Each completed (question, model) call is appended as one line; fsyncs are
+batched. The final results JSON is compacted from the journal once at the
+end instead of being rewritten after every question.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# fsync after this many records or this many seconds, whichever comes first
+FSYNC_EVERY = 20
+FSYNC_INTERVAL = 5.0
+
+
+class ResultsJournal:
+    """Crash-safe append-only JSONL writer with batched fsync."""
+
+    def __init__(self, path: Path, truncate: bool = False,
+                 fsync_every: int = FSYNC_EVERY, fsync_interval: float = FSYNC_INTERVAL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'w' if truncate else 'a', encoding='utf-8')
+
+    def append(self, record: dict):
+        """Append one record; flushed immediately, fsynced in batches."""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def sync(self):
+        with self.lock:
+            self.file.flush()
+            self._sync()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+                self._sync()
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_journal(path: Path) -> list:
+    """Read all complete records, skipping a torn last line from a crash."""
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def journal_path_for(output_file: Path) -> Path:
+    """results/foo.json -> results/foo.journal.jsonl"""
+    output_file = Path(output_file)
+    return output_file.with_name(output_file.stem + '.journal.jsonl')
+
+
+def write_json_atomic(data: dict, output_file: Path):
+    """Write the compacted results JSON via a temp file and rename."""
+    output_file = Path(output_file)
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+
+def truncate_journal(path: Path):
+    """Empty a journal whose records have been compacted into the results file."""
+    ResultsJournal(path, truncate=True).close()
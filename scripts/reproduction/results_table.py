@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Tidy columnar results table: one row per (phase, question, model, dimension)
+with its score, refusal flag, latency, tokens and response length, built
+from the merged score files and the response files in results/.
+The table is written once after the merge step as Parquet (RESULTS_TABLE),
+sorted by phase and model into small row groups, so readers load only the
+columns they ask for and skip row groups their filters rule out. Without
+pyarrow nothing is written and read_results() builds the same columns from
+the source files instead.
+
+Run from the repository root to rebuild the table:
+    python scripts/reproduction/results_table.py
+"""
+
+import json
+import operator
+import os
+from pathlib import Path
+
+from merge_engine import MERGED_OUTPUTS, MergeIndex
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pq = None
+
+RESULTS_TABLE = os.getenv("RESULTS_TABLE", "results/results_table.parquet")
+ROW_GROUP_ROWS = 1024
+
+PHASE2_RESPONSES = 'results/phase2_responses.json'
+PHASE2_SCORES = 'results/batch_phase2_standard_models_output.jsonl'
+FALSEREJECT_RESPONSES = 'results/phase3_responses.json'
+# The Phase 1 judge batches also scored the FalseReject responses (approp_/action_falsereject_* records)
+FALSEREJECT_DIMENSION_SCORES = {
+    'appropriateness': 'results/batch_appropriateness_all_models_output.jsonl',
+    'actionability': 'results/batch_actionability_all_models_output.jsonl'
+}
+
+# (column, arrow type name); Phase 1 responses are not kept in results/, so their latency/tokens are null
+COLUMNS = [
+    ('phase', 'string'),
+    ('question_id', 'string'),
+    ('model', 'string'),
+    ('dimension', 'string'),
+    ('category', 'string'),
+    ('score', 'float64'),
+    ('refused', 'bool'),
+    ('latency_seconds', 'float64'),
+    ('prompt_tokens', 'int64'),
+    ('completion_tokens', 'int64'),
+    ('response_chars', 'int64')
+]
+
+# Phase 2 response files use short model names; scores use the same full names as create_phase2_batch_evaluation.py
+PHASE2_MODEL_NAMES = {
+    'claude-sonnet-4.5': 'anthropic/claude-sonnet-4.5',
+    'deepseek-chat-v3': 'deepseek/deepseek-chat-v3-0324',
+    'gemini-2.5-flash': 'google/gemini-2.5-flash',
+    'glm-4.6': 'z-ai/glm-4.6',
+    'gpt-5': 'openai/gpt-5',
+    'gpt-oss-120b': 'openai/gpt-oss-120b',
+    'grok-4': 'x-ai/grok-4',
+    'mistral-large': 'mistralai/mistral-large',
+    'o3-mini': 'openai/o3-mini',
+    'qwen-2.5-72b': 'qwen/qwen-2.5-72b-instruct'
+}
+
+# Appropriateness refusal_type values that count as refusing
+REFUSAL_TYPES = {'hard_refusal', 'soft_refusal'}
+
+FILTER_OPS = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    'in': lambda value, options: value in options,
+    'not in': lambda value, options: value not in options
+}
+
+
+def _row(phase, question_id, model, dimension, **values) -> dict:
+    row = dict.fromkeys(name for name, _ in COLUMNS)
+    row.update(phase=phase, question_id=str(question_id), model=model, dimension=dimension, **values)
+    return row
+
+
+def _number(value, kind=float):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_json(path):
+    if not Path(path).exists():
+        print(f"⚠️  {path} not found; its rows are left out of the results table")
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _dimension_values(dimension: str, judgment: dict) -> dict:
+    """Score and refusal flag of an appropriateness/actionability judgment."""
+    refusal_type = judgment.get('refusal_type')
+    return {'score': _number(judgment.get(f'{dimension}_score')),
+            'refused': refusal_type in REFUSAL_TYPES if refusal_type else None}
+
+
+def phase1_rows():
+    merged = _load_json(MERGED_OUTPUTS['phase1']['path'])
+    if not merged:
+        return
+    for model, questions in merged['scores_by_model'].items():
+        for question_id, dimensions in questions.items():
+            for dimension, judgment in dimensions.items():
+                yield _row('phase1', question_id, model, dimension, **_dimension_values(dimension, judgment))
+
+
+def falsereject_rows():
+    """GPT-4o FalseReject judgments joined to the responses they judged (by question position).
+
+    Each response gets a 'falsereject' row (refused = judged a false
+    positive) plus a row per appropriateness/actionability score.
+    """
+    responses = _load_json(FALSEREJECT_RESPONSES) or {'questions': []}
+    questions = responses['questions']
+
+    def answer_values(model, question_index) -> dict:
+        position = _number(question_index, int)
+        question = questions[position] if position is not None and position < len(questions) else {}
+        answer = question.get('model_responses', {}).get(model, {})
+        return {'category': question.get('category'),
+                'latency_seconds': _number(answer.get('latency')),
+                'response_chars': len(answer['response']) if answer.get('response') else None}
+
+    merged = _load_json(MERGED_OUTPUTS['falsereject']['path'])
+    for model, judgments in (merged or {'scores_by_model': {}})['scores_by_model'].items():
+        for question_index, judgment in judgments.items():
+            yield _row('falsereject', question_index, model, 'falsereject',
+                       refused=judgment.get('is_false_positive'), **answer_values(model, question_index))
+
+    index = MergeIndex()
+    for dimension, path in FALSEREJECT_DIMENSION_SCORES.items():
+        if Path(path).exists():
+            index.add_file(path, 'falsereject', dimension)
+        else:
+            print(f"⚠️  {path} not found; its rows are left out of the results table")
+    for model, scores in index.iter_model_scores('falsereject'):
+        for question_index, dimensions in scores.items():
+            for dimension, judgment in dimensions.items():
+                yield _row('falsereject', question_index, model, dimension,
+                           **_dimension_values(dimension, judgment), **answer_values(model, question_index))
+
+
+def phase2_rows():
+    """Phase 2 contract tasks with their quality scores (batch judge for standard models, inline for abliterated)."""
+    responses = _load_json(PHASE2_RESPONSES)
+    if not responses:
+        return
+    scores = {}
+    if Path(PHASE2_SCORES).exists():
+        index = MergeIndex()
+        index.add_file(PHASE2_SCORES, 'phase2', 'quality')
+        for model, tasks in index.iter_model_scores('phase2'):
+            for task_id, dimensions in tasks.items():
+                scores[(model, task_id)] = dimensions['quality'].get('score')
+
+    for task in responses['tasks']:
+        model = PHASE2_MODEL_NAMES.get(task['model'], task['model'])
+        yield _row('phase2', task['task_id'], model, 'quality',
+                   category=task.get('task_type'),
+                   score=_number(scores.get((model, task['task_id']))),
+                   latency_seconds=_number(task.get('latency_seconds')),
+                   prompt_tokens=_number(task.get('prompt_tokens'), int),
+                   completion_tokens=_number(task.get('completion_tokens'), int),
+                   response_chars=len(task['response']) if task.get('response') else None)
+        for model, answer in (task.get('model_responses') or {}).items():
+            evaluation = answer.get('evaluation') or {}
+            yield _row('phase2', task['task_id'], model, 'quality',
+                       category=task.get('task_type'),
+                       score=_number(evaluation.get('quality_score')),
+                       latency_seconds=_number(answer.get('latency')),
+                       response_chars=len(answer['response']) if answer.get('response') else None)
+
+
+def build_rows() -> list:
+    """Every result row, sorted by (phase, model) so row groups cover few of each."""
+    rows = [*phase1_rows(), *falsereject_rows(), *phase2_rows()]
+    rows.sort(key=lambda row: (row['phase'], row['model']))
+    return rows
+
+
+def _matches(row: dict, filters) -> bool:
+    return all(row[column] is not None and FILTER_OPS[op](row[column], value) for column, op, value in filters)
+
+
+def _columns(rows: list, columns: list) -> dict:
+    return {column: [row[column] for row in rows] for column in columns}
+
+
+def write_results_table(rows: list = None, path=RESULTS_TABLE):
+    """Write rows (build_rows() by default) as Parquet; returns the row count (None without pyarrow)."""
+    if pa is None:
+        print("⚠️  pyarrow not installed; results table not written (pip install pyarrow)")
+        return None
+    rows = build_rows() if rows is None else rows
+    schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in COLUMNS])
+    table = pa.Table.from_pydict(_columns(rows, [name for name, _ in COLUMNS]), schema=schema)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path, row_group_size=ROW_GROUP_ROWS)
+    print(f"   ✅ Saved: {path} ({len(rows)} rows)")
+    return len(rows)
+
+
+def read_results(columns: list = None, filters: list = None, path=RESULTS_TABLE) -> dict:
+    """{column: values} for rows matching filters, e.g. [('phase', '==', 'phase1'), ('score', '<=', 2)].
+
+    Filters are (column, op, value) triples ANDed together, ops as in
+    FILTER_OPS; rows with a null in a filtered column never match. Only the
+    requested columns are read from the Parquet file and row groups the
+    filters exclude are skipped. Without pyarrow or the file, the same
+    result is built from the source files.
+    """
+    columns = list(columns or [name for name, _ in COLUMNS])
+    filters = list(filters or [])
+    if pq is not None and Path(path).exists():
+        expression = None
+        if filters:
+            # Arrow drops nulls for most ops but not e.g. 'not in'; require them explicitly as _matches does
+            expression = pq.filters_to_expression(filters)
+            for column, _, _ in filters:
+                expression &= pc.field(column).is_valid()
+        table = pq.read_table(path, columns=columns, filters=expression)
+        return table.to_pydict()
+    rows = [row for row in build_rows() if _matches(row, filters)]
+    return _columns(rows, columns)
+
+
+def main():
+    print("="*80)
+    print("BUILDING RESULTS TABLE")
+    print("="*80)
+    write_results_table()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Resume index for the benchmark runners.
+Built from the results journal and keyed by (benchmark, question_id, model,
+prompt hash), so a rerun only issues the calls that are missing or failed.
+Changing a prompt changes its hash, which invalidates the old answer.
+"""
+
+import hashlib
+
+from results_journal import read_journal
+
+
+def prompt_hash(prompt: str) -> str:
+    """Short stable hash of the prompt text sent to the model."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+
+def resume_key(benchmark: str, question_id: str, model: str, prompt: str) -> tuple:
+    return (benchmark, question_id, model, prompt_hash(prompt))
+
+
+class ResumeIndex:
+    """Set of (benchmark, question_id, model, prompt_hash) that already succeeded."""
+
+    def __init__(self, records: list = ()):
+        self.done = set()
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_journal(cls, journal_file) -> 'ResumeIndex':
+        return cls(read_journal(journal_file))
+
+    def add(self, record: dict):
+        """Track a journal record; errors and empty responses stay pending."""
+        key = (record.get('benchmark'), record['question_id'], record['model'], record.get('prompt_hash'))
+        result = record.get('result') or {}
+        if result.get('error') or not result.get('response'):
+            self.done.discard(key)
+        else:
+            self.done.add(key)
+
+    def is_done(self, benchmark: str, question_id: str, model: str, prompt: str) -> bool:
+        return resume_key(benchmark, question_id, model, prompt) in self.done
+
+    def pending(self, benchmark: str, questions: list, models: list, id_field: str = 'id',
+                prompt_field: str = 'question') -> list:
+        """All (question, model) pairs that still need a call, in question order."""
+        return [
+            (question, model)
+            for question in questions
+            for model in models
+            if not self.is_done(benchmark, question[id_field], model, question[prompt_field])
+        ]
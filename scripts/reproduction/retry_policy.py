@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Retry engine for the model callers.
+Errors are classified as retryable (timeouts, connection drops, 429, 5xx)
+or permanent (other 4xx, malformed requests). Retryable failures are
+retried with full-jitter exponential backoff while the per-run retry
+budget lasts, and every response records its attempt history, so a run
+finishes in one pass instead of needing separate retry scripts.
+"""
+
+import os
+import random
+import threading
+import time
+
+# Attempts per call including the first (override with RETRY_MAX_ATTEMPTS)
+MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+# Backoff before retry n is uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**n))
+BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2"))
+MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+# Retries allowed across the whole run, so a provider outage cannot stall it
+RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", "200"))
+
+RETRYABLE_STATUS = {408, 409, 425, 429}
+
+# Exception class names (anywhere in the MRO) that mean the call may succeed if repeated
+RETRYABLE_EXCEPTION_HINTS = (
+    'timeout', 'connection', 'remotedisconnected', 'chunkedencoding',
+    'protocolerror', 'ratelimit', 'internalserver', 'serviceunavailable'
+)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUS or status_code >= 500
+
+
+def is_retryable_exception(error: Exception) -> bool:
+    status_code = getattr(error, 'status_code', None)
+    if isinstance(status_code, int):
+        return is_retryable_status(status_code)
+    names = ' '.join(cls.__name__.lower() for cls in type(error).__mro__)
+    return any(hint in names for hint in RETRYABLE_EXCEPTION_HINTS)
+
+
+def backoff_delay(retry: int, rng=random) -> float:
+    """Full-jitter delay before the given retry (0-based)."""
+    return rng.uniform(0, min(MAX_DELAY, BASE_DELAY * (2 ** retry)))
+
+
+class RetryBudget:
+    """Thread-safe count of retries left for the run."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.used = 0
+        self.denied = 0
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            if self.used >= self.total:
+                self.denied += 1
+                return False
+            self.used += 1
+            return True
+
+
+_budget = RetryBudget(RETRY_BUDGET)
+_stats = {'calls': 0, 'retried_calls': 0, 'recovered': 0, 'permanent': 0, 'exhausted': 0}
+_stats_lock = threading.Lock()
+
+
+def get_budget() -> RetryBudget:
+    """Return the process-wide retry budget."""
+    return _budget
+
+
+def _count(*keys):
+    with _stats_lock:
+        for key in keys:
+            _stats[key] += 1
+
+
+def call_with_retries(call_fn, *args) -> dict:
+    """Call a model caller, retrying retryable failures with backoff.
+
+    call_fn returns the usual result dict; failed results carry 'error' and
+    'retryable'. The returned result gets an 'attempts' list with the error,
+    latency and backoff of every attempt. This is the only retry layer: a
+    rate-limited attempt ('rate_limited') is retried without backoff, since
+    the caller's rate limiter already holds the next call for Retry-After.
+    """
+    attempts = []
+    budget = get_budget()
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        result = call_fn(*args)
+        entry = {
+            'attempt': attempt,
+            'error': (result['error'] or '')[:200] or None,
+            'retryable': result.get('retryable', False) if result['error'] else None,
+            'latency': result.get('latency') or 0.0
+        }
+        if result['error'] and result.get('usage'):
+            # The API billed this attempt even though it failed
+            entry['usage'] = result['usage']
+        attempts.append(entry)
+
+        if not result['error']:
+            _count('calls', *(('retried_calls', 'recovered') if attempt > 1 else ()))
+            break
+        if not result.get('retryable'):
+            _count('calls', 'permanent', *(('retried_calls',) if attempt > 1 else ()))
+            break
+        if attempt == MAX_ATTEMPTS or not budget.take():
+            _count('calls', 'exhausted', *(('retried_calls',) if attempt > 1 else ()))
+            break
+
+        entry['backoff'] = 0.0 if result.get('rate_limited') else backoff_delay(attempt - 1)
+        time.sleep(entry['backoff'])
+
+    result['attempts'] = attempts
+    return result
+
+
+def retrying(call_fn):
+    """call_fn wrapped with call_with_retries (same signature)."""
+    def call(*args):
+        return call_with_retries(call_fn, *args)
+    call.__name__ = getattr(call_fn, '__name__', 'call')
+    return call
+
+
+def print_retry_stats():
+    """Print how many calls needed retries and how much budget was used."""
+    budget = get_budget()
+    with _stats_lock:
+        stats = dict(_stats)
+    if not stats['calls']:
+        return
+    print(f"\n🔁 Retries: {stats['retried_calls']}/{stats['calls']} calls retried, "
+          f"{stats['recovered']} recovered, {stats['permanent']} permanent errors, "
+          f"{stats['exhausted']} gave up")
+    print(f"   Budget used: {budget.used}/{budget.total}"
+          + (f" ({budget.denied} retries denied)" if budget.denied else ""))
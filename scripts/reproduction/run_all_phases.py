@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Unified runner: Phase 1, FalseReject and Phase 2 in one scheduled job.
+Builds the full (phase, question, model) work graph up front and runs it
+through the async engine with a separate in-flight limit per provider, so
+the self-hosted abliterated models (OpenWebUI) and the OpenRouter models
+are all busy at once and a slow provider never holds up a fast one.
+
+Every (phase, model group) keeps its own journal and results file; the
+abliterated outputs are the same files run_all_abliterated_benchmarks.py
+writes, so either script can resume the other's run.
+
+Usage (from the repository root):
+    python3 scripts/reproduction/run_all_phases.py
+
+Configuration (environment variables):
+    RUN_PHASES               subset of phase1,falsereject,phase2 (default: all)
+    RUN_MODEL_GROUPS         subset of abliterated,standard (default: all;
+                             standard needs OPENAI_API_KEY and OPENROUTER_API_KEY)
+    <PROVIDER>_CONCURRENCY   in-flight calls per provider, e.g. OPENWEBUI_CONCURRENCY=2
+    RUN_PRIORITY             phases in dispatch order, e.g. falsereject,phase1,phase2
+                             (default: all phases share one priority)
+    RUN_DEADLINES            seconds after start each phase should finish by,
+                             e.g. falsereject=600; earlier deadlines dispatch first
+    MODEL_WEIGHTS            relative share per model, e.g. openai/gpt-5=0.5
+"""
+
+import os
+import time
+from pathlib import Path
+
+from async_engine import concurrency_for, print_speedup, provider_for, run_jobs
+from cost_tracker import get_cost_tracker, print_cost_report
+from latency_tracker import get_tracker, print_tail_report
+from response_cache import print_cache_stats
+from results_journal import ResultsJournal, journal_path_for, truncate_journal, write_json_atomic
+from resume_index import prompt_hash
+from retry_policy import print_retry_stats, retrying
+from scheduler import parse_mapping, print_scheduler_metrics
+from run_all_abliterated_benchmarks import (
+    ABLITERATED_MODELS, BASE_DIR, EARLY_REFUSAL, EARLY_REFUSAL_CANCEL, FALSEREJECT_OUTPUT,
+    PHASE1_OUTPUT, PHASE2_OUTPUT, StreamingRefusalDetector, call_abliterated_model,
+    classify_refusal, compact_results, load_falsereject_questions, load_phase1_questions,
+    load_phase2_tasks, load_resume_index
+)
+
+RUN_PHASES = os.getenv("RUN_PHASES", "phase1,falsereject,phase2").split(',')
+RUN_MODEL_GROUPS = os.getenv("RUN_MODEL_GROUPS", "abliterated,standard").split(',')
+RUN_PRIORITY = [key for key in os.getenv("RUN_PRIORITY", "").split(',') if key]
+RUN_DEADLINES = parse_mapping(os.getenv("RUN_DEADLINES", ""))
+
+# phase key -> benchmark name, question loader, refusal detection, output per model group
+PHASES = {
+    'phase1': {
+        'benchmark': "Phase 1",
+        'loader': load_phase1_questions,
+        'detect_refusals': False,
+        'outputs': {
+            'abliterated': PHASE1_OUTPUT,
+            'standard': BASE_DIR / "results" / "standard_phase1_final.json"
+        }
+    },
+    'falsereject': {
+        'benchmark': "FalseReject",
+        'loader': load_falsereject_questions,
+        'detect_refusals': True,
+        'outputs': {
+            'abliterated': FALSEREJECT_OUTPUT,
+            'standard': BASE_DIR / "results" / "standard_falsereject_final.json"
+        }
+    },
+    'phase2': {
+        'benchmark': "Phase 2",
+        'loader': load_phase2_tasks,
+        'detect_refusals': False,
+        'outputs': {
+            'abliterated': PHASE2_OUTPUT,
+            'standard': BASE_DIR / "results" / "standard_phase2_final.json"
+        }
+    }
+}
+
+def load_model_groups(names: list) -> dict:
+    """Model group -> (models, blocking call function)"""
+    groups = {}
+    if 'abliterated' in names:
+        groups['abliterated'] = (ABLITERATED_MODELS, retrying(call_abliterated_model))
+    if 'standard' in names:
+        # Imported lazily: the FalseReject runner checks its API keys on import
+        from run_falsereject_benchmark import ALL_MODELS, call_openrouter_api
+        groups['standard'] = (ALL_MODELS, retrying(call_openrouter_api))
+    return groups
+
+def build_targets(phase_keys: list, groups: dict) -> list:
+    """One target per (phase, model group): questions, models, journal and resume state"""
+    targets = []
+    for phase_key in phase_keys:
+        phase = PHASES[phase_key]
+        questions = phase['loader']()
+        for group, (models, call_fn) in groups.items():
+            output_file = Path(phase['outputs'][group])
+            journal_file = journal_path_for(output_file)
+            results = compact_results(phase['benchmark'], questions, output_file, journal_file, models)
+            targets.append({
+                'phase': phase_key,
+                'group': group,
+                'benchmark': phase['benchmark'],
+                'questions': questions,
+                'models': models,
+                'call_fn': call_fn,
+                'detect_refusals': phase['detect_refusals'],
+                'output_file': output_file,
+                'journal_file': journal_file,
+                'resume': load_resume_index(phase['benchmark'], results, journal_file)
+            })
+            get_tracker().seed_from_journal(journal_file)
+    return targets
+
+def build_jobs(targets: list) -> list:
+    """The pending (phase, question, model) calls of every target, as engine jobs"""
+    jobs = []
+    for target in targets:
+        pending = target['resume'].pending(target['benchmark'], target['questions'], target['models'])
+        target['pending'] = len(pending)
+        for question_data, model in pending:
+            if target['group'] == 'abliterated':
+                refusal_detector = None
+                if target['detect_refusals'] and EARLY_REFUSAL:
+                    refusal_detector = StreamingRefusalDetector(cancel=EARLY_REFUSAL_CANCEL)
+                args = (model, question_data['question'], 4000, refusal_detector, target['benchmark'])
+            else:
+                args = (model, question_data['question'], target['benchmark'])
+            jobs.append({
+                'provider': provider_for(model),
+                'priority': RUN_PRIORITY.index(target['phase']) if target['phase'] in RUN_PRIORITY else len(RUN_PRIORITY),
+                'deadline': RUN_DEADLINES.get(target['phase']),
+                'call_fn': target['call_fn'],
+                'args': args,
+                'target': target,
+                'question_data': question_data,
+                'model': model
+            })
+    return jobs
+
+def print_refusal_rates(results: dict, models: list):
+    """FalseReject refusal rate per model"""
+    total = len(results['questions'])
+    for model in models:
+        refused = sum(1 for q in results['questions']
+                      if q['model_responses'].get(model, {}).get('is_refusal', False))
+        refusal_rate = (refused / total * 100) if total > 0 else 0
+        print(f"  {model}: {refused}/{total} refused ({refusal_rate:.1f}%)")
+
+def main():
+    print("=" * 80)
+    print("ALL PHASES - UNIFIED MULTI-PROVIDER RUN")
+    print("=" * 80)
+
+    start_time = time.time()
+    phase_keys = [key for key in PHASES if key in RUN_PHASES]
+    groups = load_model_groups(RUN_MODEL_GROUPS)
+
+    print("\n📋 Building work graph...")
+    targets = build_targets(phase_keys, groups)
+    jobs = build_jobs(targets)
+
+    for target in targets:
+        total = len(target['questions']) * len(target['models'])
+        print(f"  {target['benchmark']:<12} {target['group']:<12} "
+              f"{target['pending']}/{total} pending → {target['output_file'].name}")
+
+    providers = sorted({job['provider'] for job in jobs})
+    concurrency = {provider: concurrency_for(provider) for provider in providers}
+    print(f"\n🔀 In flight per provider: "
+          f"{', '.join(f'{provider}={limit}' for provider, limit in concurrency.items()) or '-'}")
+    print(f"📊 Pending API calls: {len(jobs)}")
+
+    for target in targets:
+        target['journal'] = ResultsJournal(target['journal_file'])
+
+    completed = 0
+    succeeded = 0
+
+    def on_result(job, result):
+        nonlocal completed, succeeded
+        completed += 1
+        target = job['target']
+        question_data = job['question_data']
+        label = f"{target['benchmark']} {question_data['id']} {job['model']}"
+
+        if result['error']:
+            print(f"   [{completed}/{len(jobs)}] ❌ {label}: {result['error'][:50]}")
+        else:
+            succeeded += 1
+            if target['detect_refusals']:
+                result['is_refusal'], result['refusal_reason'] = classify_refusal(result)
+            status = "🚫 REFUSED" if result.get('is_refusal') else "✅"
+            print(f"   [{completed}/{len(jobs)}] {status} {label} ({result['latency']:.1f}s)")
+
+        target['journal'].append({
+            'benchmark': target['benchmark'],
+            'question_id': question_data['id'],
+            'model': job['model'],
+            'prompt_hash': prompt_hash(question_data['question']),
+            'result': result
+        })
+        get_cost_tracker().record(job['model'], target['benchmark'], result)
+
+    if jobs:
+        print("\n🚀 Running...\n")
+        _, stats = run_jobs(jobs, concurrency=concurrency, on_result=on_result)
+        print(f"\n   📊 Success: {succeeded}/{len(jobs)} ({succeeded / len(jobs) * 100:.1f}%)")
+        print_speedup(stats)
+        print_scheduler_metrics(stats['scheduler'])
+        print_tail_report()
+    else:
+        print("\n   ⏭️  Nothing to do (all responses already journaled)")
+
+    # Compact every journal into its results file once
+    print(f"\n💾 Results:")
+    falsereject_results = []
+    for target in targets:
+        target['journal'].close()
+        results = compact_results(target['benchmark'], target['questions'], target['output_file'],
+                                  target['journal_file'], target['models'])
+        write_json_atomic(results, target['output_file'])
+        # The results file now holds every journaled record, so the journal starts over
+        truncate_journal(target['journal_file'])
+        print(f"  • {target['benchmark']} ({target['group']}): {target['output_file']}")
+        if target['detect_refusals']:
+            falsereject_results.append((results, target['models']))
+
+    if falsereject_results:
+        print(f"\n{'=' * 80}")
+        print("FALSEREJECT REFUSAL RATES")
+        print("=" * 80)
+        for results, models in falsereject_results:
+            print_refusal_rates(results, models)
+
+    print(f"\nTotal time: {(time.time() - start_time) / 60:.1f} minutes")
+    print_cache_stats()
+    print_retry_stats()
+    print_cost_report()
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,40 @@ Reuses the same API approach as Phase 1.
 """
 
 import csv
-import json
 import os
 import time
 from pathlib import Path
 from datetime import datetime
-import requests
-from openai import OpenAI
+from openai import RateLimitError
+
+from async_engine import DEFAULT_CONCURRENCY, print_speedup, provider_for, run_jobs
+from cost_tracker import attach_usage, get_cost_tracker, print_cost_report, usage_from, within_budget
+from http_pool import get_openai_client, post_json
+from latency_tracker import get_tracker, hedged_call, is_timeout, print_tail_report
+from rate_limiter import estimate_tokens, get_limiter
+from response_cache import get_cache, key_for, print_cache_stats
+from results_journal import ResultsJournal, journal_path_for, read_journal, write_json_atomic
+from resume_index import ResumeIndex, prompt_hash
+from retry_policy import call_with_retries, is_retryable_exception, is_retryable_status, print_retry_stats, retrying
+from scheduler import print_scheduler_metrics
+from streaming import STREAM_RESPONSES, stream_chat_completion, stream_metrics, stream_openai_completion
 
 # API Configuration (load from environment variables)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+# Override to point at a local stub (see stub_server.py); OpenAI honours OPENAI_BASE_URL
+OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+# Set BENCHMARK_SERIAL=1 to fall back to the original one-call-at-a-time loop
+RUN_SERIAL = os.getenv("BENCHMARK_SERIAL") == "1"
 
 if not OPENAI_API_KEY or not OPENROUTER_API_KEY:
     raise ValueError("Please set OPENAI_API_KEY and OPENROUTER_API_KEY environment variables")
 
+BENCHMARK_NAME = 'falsereject'
+OUTPUT_FILE = Path('results/falsereject_benchmark.json')
+JOURNAL_FILE = journal_path_for(OUTPUT_FILE)
+
 # Model Configuration (EXACT same as Phase 1 - ALL via OpenRouter)
 ALL_MODELS = [
     "anthropic/claude-sonnet-4.5",
@@ -52,80 +71,185 @@ def load_falsereject_questions(csv_file: Path) -> list:
 
     return questions
 
-def call_openai_api(model: str, question: str) -> dict:
+def call_openai_api(model: str, question: str, phase: str = BENCHMARK_NAME) -> dict:
     """Call OpenAI API (for gpt-4o, gpt-5, o3-mini)."""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "user", "content": question}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 4000
+    }
+    cache = get_cache()
+    cache_key = key_for('openai', payload)
+    cached = cache.lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    limiter = get_limiter('openai')
+    estimated = estimate_tokens(question, 4000)
+    usage = None
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        # Retries on 429 are left to the limiter so it can track Retry-After
+        client = get_openai_client(OPENAI_API_KEY, max_retries=0)
+
+        def send(timeout):
+            if STREAM_RESPONSES:
+                return stream_openai_completion(client, payload, timeout=timeout)
+            return client.chat.completions.create(**payload, timeout=timeout)
+
+        def usage_of(response):
+            if STREAM_RESPONSES:
+                return response.usage
+            return response.usage.model_dump() if response.usage else None
+
+        def content_of(response):
+            return response.content if STREAM_RESPONSES else response.choices[0].message.content
 
+        def record_discarded(response):
+            # A losing hedge copy still used (and was billed for) tokens
+            discarded_usage = usage_of(response)
+            limiter.record_usage(estimated, (discarded_usage or {}).get('total_tokens', 0))
+            get_cost_tracker().charge(model, phase, usage_from(discarded_usage, question, content_of(response)))
+
+        limiter.acquire(estimated)
         start_time = time.time()
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": question}
-            ],
-            temperature=0.7,
-            max_tokens=4000
-        )
+        try:
+            response = hedged_call(model, send, 600, on_hedge=lambda: limiter.acquire(estimated),
+                                   phase=phase, on_discard=record_discarded)
+        except RateLimitError as e:
+            # Pause the endpoint; call_with_retries retries once the limiter lets calls through
+            limiter.record_rate_limit(e.response.headers.get('retry-after'))
+            raise
         latency = time.time() - start_time
 
-        return {
-            'response': response.choices[0].message.content,
+        limiter.record_success()
+        get_tracker().record(model, latency, phase=phase)
+        usage = usage_of(response)
+        content = content_of(response)
+        limiter.record_usage(estimated, (usage or {}).get('total_tokens', 0))
+
+        result = {
+            'response': content,
             'latency': latency,
             'error': None
         }
+        if STREAM_RESPONSES:
+            result.update(stream_metrics(response))
+        attach_usage(result, model, usage, question)
 
     except Exception as e:
-        return {
+        if is_timeout(e):
+            get_tracker().record_timeout(model, phase)
+        error = {
             'response': '',
             'latency': 0,
-            'error': str(e)
+            'error': str(e),
+            'retryable': is_retryable_exception(e),
+            'rate_limited': isinstance(e, RateLimitError)
         }
+        if usage:
+            # The API answered (and billed) before the failure
+            attach_usage(error, model, usage, question)
+        return error
+
+    # Outside the API try: a cache write failure must not turn a good response into an error
+    cache.store(cache_key, result)
+    return result
 
-def call_openrouter_api(model: str, question: str) -> dict:
+def call_openrouter_api(model: str, question: str, phase: str = BENCHMARK_NAME) -> dict:
     """Call OpenRouter API (for Claude, Gemini, Llama, Qwen, DeepSeek, GLM, Grok)."""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "user", "content": question}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 4000
+    }
+    cache = get_cache()
+    cache_key = key_for('openrouter', payload)
+    cached = cache.lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    limiter = get_limiter('openrouter')
+    estimated = estimate_tokens(question, 4000)
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    def send(timeout):
+        if STREAM_RESPONSES:
+            return stream_chat_completion(OPENROUTER_URL, headers, payload, timeout=timeout)
+        return post_json(url=OPENROUTER_URL, headers=headers, payload=payload, timeout=timeout)
+
+    def record_discarded(response):
+        # A losing hedge copy still used (and was billed for) tokens
+        data = response.json()
+        limiter.record_usage(estimated, (data.get('usage') or {}).get('total_tokens', 0))
+        content = ((data.get('choices') or [{}])[0].get('message') or {}).get('content')
+        get_cost_tracker().charge(model, phase, usage_from(data.get('usage'), question, content))
+
+    usage = None
     try:
+        limiter.acquire(estimated)
         start_time = time.time()
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": model,
-                "messages": [
-                    {"role": "user", "content": question}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4000
-            },
-            timeout=120
-        )
+        response = hedged_call(model, send, 120, on_hedge=lambda: limiter.acquire(estimated),
+                               phase=phase, on_discard=record_discarded)
         latency = time.time() - start_time
+        if response.status_code == 429:
+            # Pause the endpoint; call_with_retries retries once the limiter lets calls through
+            limiter.record_rate_limit(response.headers.get('Retry-After'))
 
         if response.status_code == 200:
             data = response.json()
-            return {
+            usage = data.get('usage')
+            limiter.record_success()
+            limiter.record_usage(estimated, (usage or {}).get('total_tokens', 0))
+            get_tracker().record(model, latency, phase=phase)
+            result = {
                 'response': data['choices'][0]['message']['content'],
                 'latency': latency,
                 'error': None
             }
+            if STREAM_RESPONSES:
+                result.update(stream_metrics(response))
+            attach_usage(result, model, usage, question)
         else:
             return {
                 'response': '',
                 'latency': latency,
-                'error': f"HTTP {response.status_code}: {response.text}"
+                'error': f"HTTP {response.status_code}: {response.text}",
+                'retryable': is_retryable_status(response.status_code),
+                'rate_limited': response.status_code == 429
             }
 
     except Exception as e:
-        return {
+        if is_timeout(e):
+            get_tracker().record_timeout(model, phase)
+        error = {
             'response': '',
             'latency': 0,
-            'error': str(e)
+            'error': str(e),
+            'retryable': is_retryable_exception(e)
         }
+        if usage:
+            # The API answered (and billed) before the failure
+            attach_usage(error, model, usage, question)
+        return error
 
-def run_benchmark(questions: list) -> dict:
-    """Run all questions through all models."""
+    cache.store(cache_key, result)
+    return result
+
+def build_results(questions: list, records: list) -> dict:
+    """Compact journal records into the falsereject_benchmark.json schema."""
+    responses = {}
+    for record in records:
+        # Later records win, so a rerun's answer replaces an earlier one
+        responses[(record['question_id'], record['model'])] = record['result']
 
     results = {
         'metadata': {
@@ -138,6 +262,31 @@ def run_benchmark(questions: list) -> dict:
         'results': []
     }
 
+    for question_data in questions:
+        question_id = question_data['question_id']
+        results['results'].append({
+            **question_data,
+            'model_responses': {
+                model: responses[(question_id, model)]
+                for model in ALL_MODELS if (question_id, model) in responses
+            }
+        })
+
+    return results
+
+def journal_record(question_data: dict, model: str, result: dict) -> dict:
+    """One journal line per (question, model) response."""
+    return {
+        'benchmark': BENCHMARK_NAME,
+        'question_id': question_data['question_id'],
+        'model': model,
+        'prompt_hash': prompt_hash(question_data['question']),
+        'result': result
+    }
+
+def run_benchmark(questions: list, journal: ResultsJournal, resume: ResumeIndex):
+    """Run all questions through all models."""
+
     total_calls = len(questions) * len(ALL_MODELS)
     completed = 0
 
@@ -164,10 +313,19 @@ def run_benchmark(questions: list) -> dict:
             completed += 1
             model_short = model.split('/')[-1]
 
+            if resume.is_done(BENCHMARK_NAME, question_id, model, question):
+                print(f"   [{completed}/{total_calls}] ⏭️  {model_short} (already done)")
+                continue
+            if not within_budget():
+                print(f"\n   ⏸️  Budget reached, stopping (rerun to resume)")
+                return
+
             print(f"   [{completed}/{total_calls}] 🟢 OpenRouter {model_short}...", end=" ", flush=True)
-            result = call_openrouter_api(model, question)
+            result = call_with_retries(call_openrouter_api, model, question)
+            get_cost_tracker().record(model, BENCHMARK_NAME, result)
 
             model_responses[model] = result
+            journal.append(journal_record(question_data, model, result))
 
             # Print result
             if result['error']:
@@ -176,28 +334,66 @@ def run_benchmark(questions: list) -> dict:
                 response_len = len(result['response'])
                 print(f"✅ ({result['latency']:.1f}s, {response_len} chars)")
 
-            # Rate limiting
-            time.sleep(1)
+        if model_responses:
+            success_rate = sum(1 for m in model_responses.values() if not m['error']) / len(model_responses) * 100
+            print(f"\n   📊 Progress: {completed}/{total_calls} ({success_rate:.1f}% success for this question)")
 
-        # Add to results
-        results['results'].append({
-            **question_data,
-            'model_responses': model_responses
+def run_benchmark_async(questions: list, journal: ResultsJournal, resume: ResumeIndex,
+                        concurrency: int = DEFAULT_CONCURRENCY):
+    """Run all questions through all models with concurrent requests per provider."""
+
+    pending_calls = resume.pending(BENCHMARK_NAME, questions, ALL_MODELS, id_field='question_id')
+    total_calls = len(pending_calls)
+
+    print(f"🚀 FalseReject Benchmark (concurrent)")
+    print("=" * 70)
+    print(f"📋 Questions: {len(questions)}")
+    print(f"🤖 Models: {len(ALL_MODELS)}")
+    print(f"📊 Pending API calls: {total_calls}/{len(questions) * len(ALL_MODELS)}")
+    print(f"🔀 In flight per provider: {concurrency}")
+    print()
+
+    jobs = []
+    for question_data, model in pending_calls:
+        jobs.append({
+            'provider': provider_for(model),
+            'args': (model, question_data['question']),
+            'question_data': question_data,
+            'model': model
         })
 
-        # Save progress after each question
-        output_file = Path('results/falsereject_benchmark.json')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+    completed = 0
+    succeeded = 0
+
+    def on_result(job, result):
+        nonlocal completed, succeeded
+        completed += 1
+        model_short = job['model'].split('/')[-1]
+        question_id = job['question_data']['question_id']
+        journal.append(journal_record(job['question_data'], job['model'], result))
+        get_cost_tracker().record(job['model'], BENCHMARK_NAME, result)
+
+        if result['error']:
+            print(f"   [{completed}/{total_calls}] ❌ {question_id} {model_short}: {result['error'][:50]}")
+        else:
+            succeeded += 1
+            print(f"   [{completed}/{total_calls}] ✅ {question_id} {model_short} "
+                  f"({result['latency']:.1f}s, {len(result['response'])} chars)")
 
-        success_rate = sum(1 for m in model_responses.values() if not m['error']) / len(ALL_MODELS) * 100
-        print(f"\n   📊 Progress: {completed}/{total_calls} ({success_rate:.1f}% success for this question)")
+    if not jobs:
+        print("   ⏭️  Nothing to do (all responses already journaled)")
+        return
 
-    return results
+    _, stats = run_jobs(jobs, retrying(call_openrouter_api), concurrency, on_result)
+
+    print(f"\n   📊 Success: {succeeded}/{total_calls} ({succeeded / total_calls * 100:.1f}%)")
+    print_speedup(stats)
+    print_scheduler_metrics(stats['scheduler'])
+    print_tail_report()
 
 def main():
     # Load FalseReject questions
-    csv_file = Path('/Users/marvin/Downloads/filtered-legal-consulting-advice.csv')
+    csv_file = Path(os.getenv('FALSEREJECT_CSV', '/Users/marvin/Downloads/filtered-legal-consulting-advice.csv'))
 
     if not csv_file.exists():
         print(f"❌ FalseReject CSV not found: {csv_file}")
@@ -207,17 +403,27 @@ def main():
     questions = load_falsereject_questions(csv_file)
     print(f"✅ Loaded {len(questions)} questions\n")
 
-    # Run benchmark
-    results = run_benchmark(questions)
+    # Run benchmark, appending each response to the journal; a rerun only
+    # issues the (question, model) calls that are missing or failed
+    resume = ResumeIndex.from_journal(JOURNAL_FILE)
+    get_tracker().seed_from_journal(JOURNAL_FILE)
+    with ResultsJournal(JOURNAL_FILE) as journal:
+        if RUN_SERIAL:
+            run_benchmark(questions, journal, resume)
+        else:
+            run_benchmark_async(questions, journal, resume)
 
-    # Final save
-    output_file = Path('results/falsereject_benchmark.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # Compact the journal into the final results file once
+    results = build_results(questions, read_journal(JOURNAL_FILE))
+    write_json_atomic(results, OUTPUT_FILE)
 
     print("\n" + "=" * 70)
     print("✨ FalseReject benchmark complete!")
-    print(f"📁 Results saved: {output_file}")
+    print(f"📁 Results saved: {OUTPUT_FILE}")
+    print(f"📒 Journal: {JOURNAL_FILE}")
+    print_cache_stats()
+    print_retry_stats()
+    print_cost_report()
     print(f"\nNext step: Merge with Phase 1 results:")
     print(f"   python3 scripts/merge_phase1_with_falsereject.py")
 
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Work scheduler for the async engine: one queue per model, weighted fair
+sharing between models, priority classes and deadlines, with queue depth
+and wait-time metrics per model.
+
+When a provider has a free slot it dispatches, among that provider's models:
+  1. the lowest job 'priority' (e.g. FalseReject before Phase 1)
+  2. the earliest job 'deadline' (seconds after start; none = last)
+  3. the model with the least weighted service so far; each dispatch
+     charges the model's mean observed latency divided by its weight
+so a slow model gets fewer slots instead of occupying all of them, and
+every model's first results arrive early rather than in question order.
+"""
+
+import heapq
+import os
+import time
+from itertools import count
+
+# Charged per dispatch until a model has an observed latency
+DEFAULT_LATENCY = 1.0
+
+
+def parse_mapping(spec: str, cast=float) -> dict:
+    """'a=1,b=2' -> {'a': 1.0, 'b': 2.0} (keys may contain ':' and '/')."""
+    mapping = {}
+    for item in spec.split(','):
+        key, sep, value = item.rpartition('=')
+        if sep and key.strip():
+            mapping[key.strip()] = cast(value)
+    return mapping
+
+
+# Relative share per model, e.g. MODEL_WEIGHTS="openai/gpt-5=0.5,z-ai/glm-4.6=2"
+MODEL_WEIGHTS = parse_mapping(os.getenv("MODEL_WEIGHTS", ""))
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class ModelQueue:
+    """Pending jobs and accounting for one model."""
+
+    def __init__(self, model: str, provider: str, weight: float):
+        self.model = model
+        self.provider = provider
+        self.weight = weight
+        self.jobs = []  # heap of (priority, deadline, seq, enqueued_at, job)
+        self.virtual_time = 0.0
+        self.max_depth = 0
+        self.dispatched = 0
+        self.completed = 0
+        self.in_flight = 0
+        self.latency_total = 0.0
+        self.waits = []
+        self.deadline_misses = 0
+
+    def mean_latency(self) -> float:
+        return self.latency_total / self.completed if self.completed else DEFAULT_LATENCY
+
+    def head_key(self) -> tuple:
+        priority, deadline, seq, _, _ = self.jobs[0]
+        return priority, deadline, self.virtual_time, seq
+
+
+class FairScheduler:
+    """Per-model queues with priorities, deadlines and weighted fair sharing.
+
+    Jobs are the async engine's job dicts; 'model' (default: args[0]),
+    'priority' (default 0) and 'deadline' (seconds after start) are read.
+    """
+
+    def __init__(self, weights: dict = None, gate=None):
+        self.weights = MODEL_WEIGHTS if weights is None else weights
+        # gate() returning False pauses dispatching (e.g. the run's budget is spent)
+        self.gate = gate
+        self.paused = False
+        self.queues = {}
+        self.seq = count()
+        self.start_time = time.time()
+
+    def _queue_for(self, job: dict) -> ModelQueue:
+        model = job.get('model') or job['args'][0]
+        if model not in self.queues:
+            weight = max(self.weights.get(model, 1.0), 1e-6)
+            self.queues[model] = ModelQueue(model, job['provider'], weight)
+        return self.queues[model]
+
+    def submit(self, job: dict):
+        queue = self._queue_for(job)
+        deadline = job.get('deadline')
+        heapq.heappush(queue.jobs, (
+            job.get('priority', 0),
+            float('inf') if deadline is None else deadline,
+            next(self.seq),
+            time.time(),
+            job
+        ))
+        queue.max_depth = max(queue.max_depth, len(queue.jobs))
+
+    def next_job(self, provider: str):
+        """Pop the next job for a free slot of provider (None when drained or paused)."""
+        if self.paused or (self.gate and not self.gate()):
+            self.paused = True
+            return None
+        candidates = [queue for queue in self.queues.values()
+                      if queue.provider == provider and queue.jobs]
+        if not candidates:
+            return None
+
+        queue = min(candidates, key=ModelQueue.head_key)
+        _, _, _, enqueued_at, job = heapq.heappop(queue.jobs)
+        queue.waits.append(time.time() - enqueued_at)
+        queue.virtual_time += queue.mean_latency() / queue.weight
+        queue.dispatched += 1
+        queue.in_flight += 1
+        return job
+
+    def complete(self, job: dict, result: dict):
+        queue = self._queue_for(job)
+        queue.in_flight -= 1
+        queue.completed += 1
+        queue.latency_total += result.get('latency') or 0.0
+        deadline = job.get('deadline')
+        if deadline is not None and time.time() - self.start_time > deadline:
+            queue.deadline_misses += 1
+
+    def queued(self) -> int:
+        return sum(len(queue.jobs) for queue in self.queues.values())
+
+    def depth(self, model: str) -> int:
+        queue = self.queues.get(model)
+        return len(queue.jobs) if queue else 0
+
+    def metrics(self) -> dict:
+        """Queue depth and wait-time metrics per model."""
+        return {
+            model: {
+                'provider': queue.provider,
+                'weight': queue.weight,
+                'queued': len(queue.jobs),
+                'max_depth': queue.max_depth,
+                'dispatched': queue.dispatched,
+                'completed': queue.completed,
+                'in_flight': queue.in_flight,
+                'mean_wait': sum(queue.waits) / len(queue.waits) if queue.waits else 0.0,
+                'p95_wait': percentile(queue.waits, 95),
+                'max_wait': max(queue.waits, default=0.0),
+                'mean_latency': queue.mean_latency() if queue.completed else None,
+                'deadline_misses': queue.deadline_misses
+            }
+            for model, queue in self.queues.items()
+        }
+
+
+def print_scheduler_metrics(metrics: dict):
+    """Print the per-model queue report after a run."""
+    if not metrics:
+        return
+    print(f"\n📥 Queues per model:")
+    print(f"   {'model':<34} {'jobs':>5} {'depth':>6} {'wait avg':>9} {'p95':>7} {'max':>7} {'latency':>8}")
+    for model, m in sorted(metrics.items(), key=lambda item: (item[1]['provider'], item[0])):
+        latency = f"{m['mean_latency']:.1f}s" if m['mean_latency'] is not None else '-'
+        line = (f"   {model:<34} {m['completed']:>5} {m['max_depth']:>6} {m['mean_wait']:>8.1f}s "
+                f"{m['p95_wait']:>6.1f}s {m['max_wait']:>6.1f}s {latency:>8}")
+        if m['deadline_misses']:
+            line += f"  ⚠️ {m['deadline_misses']} past deadline"
+        print(line)
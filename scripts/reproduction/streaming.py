@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming (server-sent events) chat completions with timing metrics.
+Consumes the stream incrementally and records time-to-first-token,
+generation tokens/sec and total latency, while producing the same
+response text as the non-streaming callers.
+"""
+
+import json
+import os
+import time
+
+from http_pool import iter_lines, read_text, stream_post
+
+# Set STREAM_RESPONSES=1 to have the callers request streamed completions
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES") == "1"
+
+
+def parse_sse_lines(lines):
+    """Yield (delta_text, usage) for each data event until [DONE]."""
+    for line in lines:
+        if not line or not line.startswith('data:'):
+            # Blank separators and ': keep-alive' comments
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            return
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+        delta = ''
+        choices = event.get('choices') or []
+        if choices:
+            delta = (choices[0].get('delta') or {}).get('content') or ''
+        yield delta, event.get('usage')
+
+
+class StreamedCompletion:
+    """Result of a streamed call, shaped like a non-streaming HTTP response."""
+
+    def __init__(self, status_code: int, headers, text: str = ''):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.content = ''
+        self.usage = None
+        self.ttft = None
+        self.latency = 0.0
+        # Set when on_delta asked to stop generation early
+        self.cancelled = False
+
+    def json(self) -> dict:
+        return {
+            'choices': [{'message': {'role': 'assistant', 'content': self.content}}],
+            'usage': self.usage
+        }
+
+
+def collect_stream(events, start_time: float, streamed: StreamedCompletion,
+                   on_delta=None) -> StreamedCompletion:
+    """Accumulate (delta, usage) events into streamed, timing the first token.
+
+    on_delta(delta) is called for every content chunk; returning True stops
+    reading, which closes the connection and cancels the generation.
+    """
+    parts = []
+    for delta, usage in events:
+        if delta:
+            if streamed.ttft is None:
+                streamed.ttft = time.time() - start_time
+            parts.append(delta)
+            if on_delta and on_delta(delta):
+                streamed.cancelled = True
+                break
+        if usage:
+            streamed.usage = usage
+    streamed.content = ''.join(parts)
+    streamed.latency = time.time() - start_time
+    return streamed
+
+
+def stream_chat_completion(url: str, headers: dict, payload: dict, timeout: float,
+                           on_delta=None) -> StreamedCompletion:
+    """POST a chat completion with stream=True and consume the SSE response."""
+    start_time = time.time()
+    payload = {**payload, 'stream': True}
+    with stream_post(url, headers, payload, timeout) as response:
+        streamed = StreamedCompletion(response.status_code, response.headers)
+        if response.status_code != 200:
+            streamed.text = read_text(response)
+            streamed.latency = time.time() - start_time
+            return streamed
+        return collect_stream(parse_sse_lines(iter_lines(response)), start_time, streamed, on_delta)
+
+
+def stream_openai_completion(client, payload: dict, on_delta=None, timeout: float = None) -> StreamedCompletion:
+    """Streamed call through the OpenAI SDK (usage arrives in the final chunk)."""
+    start_time = time.time()
+    extra = {'timeout': timeout} if timeout else {}
+    stream = client.chat.completions.create(
+        **payload,
+        stream=True,
+        stream_options={'include_usage': True},
+        **extra
+    )
+
+    def events():
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else ''
+            usage = chunk.usage.model_dump() if chunk.usage else None
+            yield delta or '', usage
+
+    streamed = collect_stream(events(), start_time, StreamedCompletion(200, {}), on_delta)
+    if streamed.cancelled:
+        stream.close()
+    return streamed
+
+
+def stream_metrics(streamed: StreamedCompletion) -> dict:
+    """Per-response timing fields added to the result dict in streaming mode."""
+    completion_tokens = (streamed.usage or {}).get('completion_tokens') or len(streamed.content) // 4
+    generation_time = streamed.latency - (streamed.ttft or 0.0)
+    return {
+        'ttft': streamed.ttft,
+        'tokens_per_sec': completion_tokens / generation_time if generation_time > 0 else None,
+        'completion_tokens': completion_tokens
+    }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for offline load testing of the runners.
+Answers both /v1/chat/completions (OpenAI / OpenRouter shape) and the
+OpenWebUI /api/chat/completions route with configurable latency, error
+rate and 429 bursts. Responses are replayed from results/phase3_responses.json
+when the (model, question) pair is known, otherwise a canned answer is sent.
+
+Usage (from the repository root):
+    python3 scripts/reproduction/stub_server.py
+
+    export OPENROUTER_URL=http://127.0.0.1:8765/v1/chat/completions
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    export OPENWEBUI_URL=http://127.0.0.1:8765/api/chat/completions
+    python3 scripts/reproduction/run_falsereject_benchmark.py
+
+Configuration (environment variables):
+    STUB_PORT            port to listen on (default 8765)
+    STUB_LATENCY         fixed:<s> | uniform:<lo>,<hi> | lognormal:<median>,<sigma>
+    STUB_ERROR_RATE      fraction of requests answered with HTTP 500
+    STUB_429_EVERY       start a 429 burst every N requests (0 = never)
+    STUB_429_BURST       length of each 429 burst
+    STUB_RETRY_AFTER     Retry-After seconds sent with 429s
+    STUB_TOKEN_RATE      tokens/sec for streamed (stream=true) responses; the
+                         sampled latency is then the time to first token
+    STUB_REPLAY          results JSON to replay responses from ('' = canned only)
+    STUB_SEED            seed; latency/errors are deterministic per (seed, prompt,
+                         attempt), so a retried or hedged request gets a fresh draw
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CHAT_ROUTES = ('/v1/chat/completions', '/api/v1/chat/completions', '/api/chat/completions')
+
+CANNED_RESPONSE = (
+    "This is a stub response for offline load testing. In a real run the model "
+    "would answer the legal question here with relevant statutes, practical next "
+    "steps and any appropriate caveats."
+)
+
+
+def load_config() -> dict:
+    return {
+        'port': int(os.getenv('STUB_PORT', '8765')),
+        'latency': os.getenv('STUB_LATENCY', 'lognormal:0.8,0.5'),
+        'error_rate': float(os.getenv('STUB_ERROR_RATE', '0')),
+        'rate_limit_every': int(os.getenv('STUB_429_EVERY', '0')),
+        'rate_limit_burst': int(os.getenv('STUB_429_BURST', '5')),
+        'retry_after': float(os.getenv('STUB_RETRY_AFTER', '1')),
+        'token_rate': float(os.getenv('STUB_TOKEN_RATE', '50')),
+        'replay': os.getenv('STUB_REPLAY', 'results/phase3_responses.json'),
+        'seed': int(os.getenv('STUB_SEED', '0'))
+    }
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Draw one latency (seconds) from a 'kind:params' spec."""
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v]
+    if kind == 'fixed':
+        return values[0] if values else 0.0
+    if kind == 'uniform':
+        return rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        median, sigma = values
+        return rng.lognormvariate(0, sigma) * median
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def load_replay(path: str) -> dict:
+    """(model, question) -> response text from a results file in the runner schema."""
+    replay = {}
+    if not path or not Path(path).exists():
+        return replay
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for question in data.get('questions', data.get('results', [])):
+        for model, result in question.get('model_responses', {}).items():
+            if result.get('response') and not result.get('error'):
+                replay[(model, question['question'])] = result['response']
+                replay.setdefault((None, question['question']), result['response'])
+    return replay
+
+
+class StubState:
+    """Shared counters so 429 bursts line up across handler threads."""
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.replay = load_replay(config['replay'])
+        self.requests = 0
+        self.attempts = {}
+        self.by_status = {}
+        self.lock = threading.Lock()
+
+    def next_request(self) -> int:
+        with self.lock:
+            self.requests += 1
+            return self.requests
+
+    def next_attempt(self, key: tuple) -> int:
+        with self.lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            return self.attempts[key]
+
+    def count(self, status: int):
+        with self.lock:
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+    def in_rate_limit_burst(self, n: int) -> bool:
+        every = self.config['rate_limit_every']
+        return every > 0 and (n - 1) % every >= every - self.config['rate_limit_burst']
+
+
+def completion_body(model: str, content: str, prompt: str) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        'id': f"stub-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+    }
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so clients can keep connections alive; without TCP_NODELAY
+        # the separate header/body writes stall on delayed ACKs under keep-alive
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+            state.count(status)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except json.JSONDecodeError:
+                self._send_json(400, {'error': {'message': 'invalid JSON body'}})
+                return
+
+            if self.path.split('?')[0] not in CHAT_ROUTES:
+                self._send_json(404, {'error': {'message': f"unknown route {self.path}"}})
+                return
+
+            n = state.next_request()
+            config = state.config
+            model = request.get('model', 'stub')
+            messages = request.get('messages') or [{}]
+            prompt = messages[-1].get('content') or ''
+
+            if state.in_rate_limit_burst(n):
+                self._send_json(429, {'error': {'message': 'rate limited (stub)'}},
+                                {'Retry-After': str(config['retry_after'])})
+                return
+
+            attempt = state.next_attempt((model, prompt))
+            rng = random.Random(f"{config['seed']}:{model}:{prompt}:{attempt}")
+            time.sleep(sample_latency(config['latency'], rng))
+
+            if rng.random() < config['error_rate']:
+                self._send_json(500, {'error': {'message': 'internal error (stub)'}})
+                return
+
+            content = state.replay.get((model, prompt)) or state.replay.get((None, prompt)) or CANNED_RESPONSE
+            if request.get('stream'):
+                self._send_stream(model, content, prompt)
+            else:
+                self._send_json(200, completion_body(model, content, prompt))
+
+        def _send_stream(self, model: str, content: str, prompt: str):
+            # No Content-Length for SSE, so close the connection when done
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            body = completion_body(model, content, prompt)
+            delay = 1.0 / state.config['token_rate'] if state.config['token_rate'] > 0 else 0.0
+            try:
+                # Roughly one ~4-character token per event
+                for start in range(0, len(content), 4):
+                    event = {'choices': [{'index': 0, 'delta': {'content': content[start:start + 4]}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    time.sleep(delay)
+                final = {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'usage': body['usage']}
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Client cancelled the generation
+                pass
+            state.count(200)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def make_server(config: dict = None) -> tuple:
+    """Create (server, state) bound to config['port'] (0 picks a free port)."""
+    config = config or load_config()
+    state = StubState(config)
+    server = ThreadingHTTPServer(('127.0.0.1', config['port']), make_handler(state))
+    server.daemon_threads = True
+    return server, state
+
+
+def start_in_thread(config: dict = None) -> tuple:
+    """Start a stub server in a background thread; returns (server, state, base_url)."""
+    server, state = make_server(config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    config = load_config()
+    server, state = make_server(config)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print("=" * 70)
+    print("OPENAI-COMPATIBLE STUB SERVER")
+    print("=" * 70)
+    print(f"Listening: {base_url}")
+    print(f"Latency: {config['latency']} | Error rate: {config['error_rate']:.0%}")
+    if config['rate_limit_every']:
+        print(f"429 bursts: {config['rate_limit_burst']} every {config['rate_limit_every']} requests "
+              f"(Retry-After {config['retry_after']}s)")
+    print(f"Replay responses: {len(state.replay)} from {config['replay'] or '(none)'}")
+    print("\nPoint the runners at it:")
+    print(f"   export OPENROUTER_URL={base_url}/v1/chat/completions")
+    print(f"   export OPENAI_BASE_URL={base_url}/v1")
+    print(f"   export OPENWEBUI_URL={base_url}/api/chat/completions")
+    print("=" * 70)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 Served {state.requests} requests: {state.by_status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,65 @@ Submit abliterated models to OpenAI Batch API for evaluation
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from openai import OpenAI
 
+from batch_builder import shard_custom_ids
+from custom_id_codec import decode_custom_id
+
 BASE_DIR = Path(__file__).parent.parent
 
+# Uploads/batch creations in flight at once
+SUBMIT_CONCURRENCY = int(os.getenv("BATCH_SUBMIT_CONCURRENCY", "4"))
+
+PHASE_LABELS = {'phase1': 'Phase 1', 'phase2': 'Phase 2', 'falsereject': 'FalseReject'}
+
+def describe_requests(custom_ids):
+    """(models, phases) a batch evaluates, decoded from its custom_ids"""
+    keys = [key for key in map(decode_custom_id, custom_ids) if key]
+    models = sorted({key['model'] for key in keys})
+    phases = sorted({key['phase'] for key in keys}, key=list(PHASE_LABELS).index)
+    return models, phases
+
+def submit_file(client, file_path, custom_ids):
+    """Upload one batch input file and create its batch job"""
+    name = file_path.name
+    models, phases = describe_requests(custom_ids)
+    model_label = ', '.join(models) or name
+    phase_label = ' + '.join(PHASE_LABELS[phase] for phase in phases) or 'unrecognized'
+    print(f"\n📤 Uploading {name}...")
+
+    # Upload file
+    with open(file_path, "rb") as f:
+        batch_input_file = client.files.create(
+            file=f,
+            purpose="batch"
+        )
+
+    print(f"   ✅ File uploaded: {batch_input_file.id} ({name})")
+
+    # Create batch job
+    batch_job = client.batches.create(
+        input_file_id=batch_input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        metadata={
+            "description": f"Evaluate {model_label} {phase_label} responses ({name})"
+        }
+    )
+
+    print(f"   🚀 Batch created: {batch_job.id} ({name})")
+    print(f"   Status: {batch_job.status}")
+    print(f"   Total requests: {batch_job.request_counts.total if hasattr(batch_job, 'request_counts') else 'unknown'}")
+
+    return {
+        'model': model_label,
+        'phase': phase_label,
+        'file_id': batch_input_file.id,
+        'batch_id': batch_job.id
+    }
+
 def main():
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
@@ -21,42 +75,12 @@ def main():
         "batch_eval_gemma3-abliterated_27b.jsonl"
     ]
 
-    batch_ids = []
-
-    for batch_file in batch_files:
-        file_path = BASE_DIR / "results" / batch_file
-
-        print(f"\n📤 Uploading {batch_file}...")
-
-        # Upload file
-        with open(file_path, "rb") as f:
-            batch_input_file = client.files.create(
-                file=f,
-                purpose="batch"
-            )
-
-        print(f"   ✅ File uploaded: {batch_input_file.id}")
-
-        # Create batch job
-        print(f"   🚀 Creating batch job...")
-        batch_job = client.batches.create(
-            input_file_id=batch_input_file.id,
-            endpoint="/v1/chat/completions",
-            completion_window="24h",
-            metadata={
-                "description": f"Evaluate {batch_file.replace('batch_eval_', '').replace('.jsonl', '')} Phase 2 responses"
-            }
-        )
-
-        print(f"   ✅ Batch created: {batch_job.id}")
-        print(f"   Status: {batch_job.status}")
-        print(f"   Total requests: {batch_job.request_counts.total if hasattr(batch_job, 'request_counts') else 'unknown'}")
+    # Sharded files (see batch_builder.py) are submitted as one batch per shard
+    shards = [shard for batch_file in batch_files
+              for shard in shard_custom_ids(BASE_DIR / "results" / batch_file)]
 
-        batch_ids.append({
-            'model': batch_file.replace('batch_eval_', '').replace('.jsonl', ''),
-            'file_id': batch_input_file.id,
-            'batch_id': batch_job.id
-        })
+    with ThreadPoolExecutor(max_workers=SUBMIT_CONCURRENCY) as executor:
+        batch_ids = list(executor.map(lambda shard: submit_file(client, *shard), shards))
 
     print("\n" + "=" * 80)
     print("✅ ALL BATCHES SUBMITTED!")
@@ -64,7 +88,7 @@ def main():
 
     print("\nBatch Job IDs:")
     for info in batch_ids:
-        print(f"  • {info['model']}: {info['batch_id']}")
+        print(f"  • {info['model']} ({info['phase']}): {info['batch_id']}")
 
     print("\nTo check status:")
     for info in batch_ids:
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Offline token counting and token-budget truncation for the batch builders.
+Counts use tiktoken's BPE tables when the package is installed and the
+tables are already in its cache (TIKTOKEN_CACHE_DIR); otherwise a fast
+regex approximation of the same pre-tokenizer, which slightly overcounts
+so a budget is never overfilled. Truncation keeps whole sentences (whole
+words when the sentence cut would leave over a fifth of the budget unused)
+and reports how many tokens each item lost.
+"""
+
+import json
+import math
+import os
+import re
+
+# Encoding of the gpt-4o judge (override with TOKEN_ENCODING)
+ENCODING = os.getenv("TOKEN_ENCODING", "o200k_base")
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoder = None
+_encoder_loaded = False
+
+# Approximation: words (~6 letters/token), 1-3 digit groups, punctuation runs, line breaks
+APPROX_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]+|\n+")
+
+# Sentence ends: terminal punctuation (plus closing quotes/brackets) before whitespace, or a line break
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s|$)|\n")
+WORD_END = re.compile(r"\S(?=\s)")
+
+# A sentence cut must keep at least this share of the budget, else a word cut is used
+MIN_SENTENCE_FILL = 0.8
+
+
+def get_encoder():
+    """tiktoken encoding if installed and cached locally, else None (approximation)."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoder = tiktoken.get_encoding(ENCODING)
+            except Exception:
+                # Tables not cached and no network: fall back to the approximation
+                _encoder = None
+    return _encoder
+
+
+def backend() -> str:
+    return f"tiktoken/{ENCODING}" if get_encoder() else "approximate"
+
+
+def approximate_tokens(text: str) -> int:
+    tokens = 0
+    for piece in APPROX_PIECES.findall(text):
+        if piece[0].isalpha():
+            # Non-ASCII scripts tokenize at roughly a character per token
+            tokens += math.ceil(len(piece) / 6) if piece.isascii() else len(piece)
+        elif piece[0] == '\n' or piece[0].isdigit():
+            tokens += 1
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text for the judge model."""
+    if not text:
+        return 0
+    encoder = get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return approximate_tokens(text)
+
+
+def _longest_prefix(text: str, cuts: list, max_tokens: int):
+    """Largest cut position whose prefix fits max_tokens (None if none fits)."""
+    best = None
+    low, high = 0, len(cuts) - 1
+    while low <= high:
+        mid = (low + high) // 2
+        if count_tokens(text[:cuts[mid]]) <= max_tokens:
+            best = cuts[mid]
+            low = mid + 1
+        else:
+            high = mid - 1
+    return best
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> tuple:
+    """Cut text to at most max_tokens at a sentence boundary.
+
+    The sentence cut is used only if it keeps MIN_SENTENCE_FILL of the
+    budget; otherwise the text is cut at the last word that fits.
+
+    Returns (text, info) where info has original/kept/dropped token counts
+    and 'cut': None (fits), 'sentence', 'word' or 'hard'.
+    """
+    text = text or ''
+    original = count_tokens(text)
+    info = {'original_tokens': original, 'kept_tokens': original, 'dropped_tokens': 0,
+            'truncated': False, 'cut': None}
+    if original <= max_tokens:
+        return text, info
+
+    cut = 'sentence'
+    end = _longest_prefix(text, [m.end() for m in SENTENCE_END.finditer(text)], max_tokens)
+    if end and count_tokens(text[:end]) < max_tokens * MIN_SENTENCE_FILL:
+        # One long sentence straddles the budget; cutting before it would waste too much
+        end = None
+    if not end:
+        cut = 'word'
+        end = _longest_prefix(text, [m.end() for m in WORD_END.finditer(text)], max_tokens)
+    if not end:
+        cut = 'hard'
+        end = _longest_prefix(text, list(range(1, len(text))), max_tokens) or 0
+
+    kept_text = text[:end].rstrip()
+    kept = count_tokens(kept_text)
+    info.update(kept_tokens=kept, dropped_tokens=original - kept, truncated=True, cut=cut)
+    return kept_text, info
+
+
+class TruncationReport:
+    """Per-item record of what truncate_to_tokens removed while building a batch."""
+
+    def __init__(self):
+        self.items = []
+
+    def fit(self, item_id: str, field: str, text: str, max_tokens: int) -> str:
+        """Truncate one field of one batch item and record the outcome."""
+        kept_text, info = truncate_to_tokens(text, max_tokens)
+        self.items.append({'item': item_id, 'field': field, 'budget': max_tokens, **info})
+        return kept_text
+
+    def truncated(self) -> list:
+        return [item for item in self.items if item['truncated']]
+
+    def summary(self) -> dict:
+        truncated = self.truncated()
+        return {
+            'backend': backend(),
+            'fields': len(self.items),
+            'truncated': len(truncated),
+            'tokens_in': sum(item['original_tokens'] for item in self.items),
+            'tokens_dropped': sum(item['dropped_tokens'] for item in truncated),
+            'by_cut': {cut: sum(1 for item in truncated if item['cut'] == cut)
+                       for cut in ('sentence', 'word', 'hard')}
+        }
+
+    def save(self, path):
+        """Write the summary and the truncated items as JSON next to the batch file."""
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'items': self.truncated()}, f, indent=2)
+
+
+def print_truncation_report(report: TruncationReport, top: int = 5):
+    """Print how many fields were cut and the items that lost the most."""
+    summary = report.summary()
+    if not summary['fields']:
+        return
+    share = summary['tokens_dropped'] / summary['tokens_in'] * 100 if summary['tokens_in'] else 0.0
+    print(f"\n✂️  Truncation ({summary['backend']} token counts):")
+    print(f"   {summary['truncated']}/{summary['fields']} fields cut, "
+          f"{summary['tokens_dropped']:,} of {summary['tokens_in']:,} tokens dropped ({share:.1f}%)")
+    if summary['truncated']:
+        cuts = ', '.join(f"{count} at {cut}" for cut, count in summary['by_cut'].items() if count)
+        print(f"   Cut points: {cuts}")
+        worst = sorted(report.truncated(), key=lambda item: item['dropped_tokens'], reverse=True)[:top]
+        for item in worst:
+            print(f"   {item['item']} [{item['field']}]: {item['original_tokens']:,} → "
+                  f"{item['kept_tokens']:,} tokens (budget {item['budget']:,})")